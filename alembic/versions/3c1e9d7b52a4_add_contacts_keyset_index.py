@@ -0,0 +1,35 @@
+"""add_contacts_keyset_index
+
+Revision ID: 3c1e9d7b52a4
+Revises: f2b823dbb5ba
+Create Date: 2026-10-18 10:12:40.318204
+
+"""
+
+from typing import Sequence, Union
+
+from src.database.online_migrations import (
+    create_index_concurrently,
+    drop_index_concurrently,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1e9d7b52a4"
+down_revision: Union[str, None] = "f2b823dbb5ba"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    create_index_concurrently(
+        "ix_contacts_user_id_last_name_first_name_id",
+        "contacts",
+        ["user_id", "last_name", "first_name", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently("ix_contacts_user_id_last_name_first_name_id", "contacts")
@@ -0,0 +1,45 @@
+"""add_contacts_birthday_mmdd
+
+Revision ID: 5b7d2e8f1a30
+Revises: 8e4f0a6c91d2
+Create Date: 2026-10-18 11:48:52.560931
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from src.database.online_migrations import (
+    create_index_concurrently,
+    drop_index_concurrently,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b7d2e8f1a30"
+down_revision: Union[str, None] = "8e4f0a6c91d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # An expression index rather than a stored generated column, which would
+    # rewrite the whole table. Must match Contact.birthday_mmdd.
+    create_index_concurrently(
+        "ix_contacts_user_id_birthday_mmdd",
+        "contacts",
+        [
+            "user_id",
+            sa.text(
+                "CAST(EXTRACT(month FROM birthday) * 100"
+                " + EXTRACT(day FROM birthday) AS SMALLINT)"
+            ),
+        ],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently("ix_contacts_user_id_birthday_mmdd", "contacts")
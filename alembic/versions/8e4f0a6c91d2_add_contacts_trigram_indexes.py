@@ -0,0 +1,54 @@
+"""add_contacts_trigram_indexes
+
+Revision ID: 8e4f0a6c91d2
+Revises: 3c1e9d7b52a4
+Create Date: 2026-10-18 11:03:17.904512
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from src.database.online_migrations import (
+    create_index_concurrently,
+    drop_index_concurrently,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e4f0a6c91d2"
+down_revision: Union[str, None] = "3c1e9d7b52a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRGM_INDEXES = {
+    "ix_contacts_user_id_first_name_trgm": "first_name",
+    "ix_contacts_user_id_last_name_trgm": "last_name",
+    "ix_contacts_user_id_email_trgm": "email",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    # btree_gin lets user_id lead the GIN indexes, so a search only visits
+    # the posting lists of the searching user's contacts.
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin;")
+    for index_name, column in TRGM_INDEXES.items():
+        create_index_concurrently(
+            index_name,
+            "contacts",
+            ["user_id", column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for index_name in TRGM_INDEXES:
+        drop_index_concurrently(index_name, "contacts")
+    # The pg_trgm and btree_gin extensions are left installed; other objects
+    # may depend on them.
@@ -0,0 +1,33 @@
+"""add_contact_tombstones_deleted_at_index
+
+Revision ID: b8e1f4a2c7d5
+Revises: f7b3c5d9e281
+Create Date: 2026-10-18 19:24:07.318542
+
+"""
+
+from typing import Sequence, Union
+
+from src.database.online_migrations import (
+    create_index_concurrently,
+    drop_index_concurrently,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e1f4a2c7d5"
+down_revision: Union[str, None] = "f7b3c5d9e281"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves the tombstone retention sweep, which deletes across all users.
+    create_index_concurrently(
+        "ix_contact_tombstones_deleted_at", "contact_tombstones", ["deleted_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently("ix_contact_tombstones_deleted_at", "contact_tombstones")
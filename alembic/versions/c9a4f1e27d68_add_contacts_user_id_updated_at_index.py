@@ -0,0 +1,37 @@
+"""add_contacts_user_id_updated_at_index
+
+Revision ID: c9a4f1e27d68
+Revises: 5b7d2e8f1a30
+Create Date: 2026-10-18 14:21:06.117385
+
+"""
+
+from typing import Sequence, Union
+
+from src.database.online_migrations import (
+    create_index_concurrently,
+    drop_index_concurrently,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c9a4f1e27d68"
+down_revision: Union[str, None] = "5b7d2e8f1a30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The delta sync keyset is (updated_at, id); with id in the index the
+    # tuple comparison and ORDER BY are both served by one index range.
+    create_index_concurrently(
+        "ix_contacts_user_id_updated_at_id",
+        "contacts",
+        ["user_id", "updated_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently("ix_contacts_user_id_updated_at_id", "contacts")
@@ -0,0 +1,130 @@
+"""add_contact_change_count
+
+Revision ID: d4a7c2e9b1f3
+Revises: b8e1f4a2c7d5
+Create Date: 2026-10-18 20:41:15.902364
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.online_migrations import set_lock_timeout
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a7c2e9b1f3"
+down_revision: Union[str, None] = "b8e1f4a2c7d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INSERT_TRIGGER_FUNC = """
+CREATE OR REPLACE FUNCTION contact_counts_after_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO contact_counts (user_id, contact_count, change_count)
+    SELECT user_id, count(*), 1 FROM new_contacts GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET contact_count = contact_counts.contact_count + EXCLUDED.contact_count,
+        change_count = contact_counts.change_count + 1;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+"""
+
+UPDATE_TRIGGER_FUNC = """
+CREATE OR REPLACE FUNCTION contact_counts_after_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE contact_counts
+    SET change_count = contact_counts.change_count + 1
+    FROM (SELECT DISTINCT user_id FROM new_contacts) AS updated
+    WHERE contact_counts.user_id = updated.user_id;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+"""
+
+DELETE_TRIGGER_FUNC = """
+CREATE OR REPLACE FUNCTION contact_counts_after_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE contact_counts
+    SET contact_count = contact_counts.contact_count - deleted.n,
+        change_count = contact_counts.change_count + 1
+    FROM (
+        SELECT user_id, count(*) AS n FROM old_contacts GROUP BY user_id
+    ) AS deleted
+    WHERE contact_counts.user_id = deleted.user_id;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+"""
+
+# The functions as f7b3c5d9e281 created them, restored on downgrade.
+PREVIOUS_INSERT_TRIGGER_FUNC = """
+CREATE OR REPLACE FUNCTION contact_counts_after_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO contact_counts (user_id, contact_count)
+    SELECT user_id, count(*) FROM new_contacts GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET contact_count = contact_counts.contact_count + EXCLUDED.contact_count;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+"""
+
+PREVIOUS_DELETE_TRIGGER_FUNC = """
+CREATE OR REPLACE FUNCTION contact_counts_after_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE contact_counts
+    SET contact_count = contact_counts.contact_count - deleted.n
+    FROM (
+        SELECT user_id, count(*) AS n FROM old_contacts GROUP BY user_id
+    ) AS deleted
+    WHERE contact_counts.user_id = deleted.user_id;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+"""
+
+UPDATE_TRIGGER = "trigger_contact_counts_update"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    set_lock_timeout()
+    # A constant default only touches the catalog; the table is not rewritten.
+    op.add_column(
+        "contact_counts",
+        sa.Column("change_count", sa.BigInteger(), server_default="0", nullable=False),
+    )
+
+    # One bump per user per statement, like the contact count itself.
+    op.execute(INSERT_TRIGGER_FUNC)
+    op.execute(UPDATE_TRIGGER_FUNC)
+    op.execute(DELETE_TRIGGER_FUNC)
+    op.execute(
+        f"""
+        CREATE TRIGGER {UPDATE_TRIGGER}
+        AFTER UPDATE ON contacts
+        REFERENCING NEW TABLE AS new_contacts
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION contact_counts_after_update();
+    """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    set_lock_timeout()
+    op.execute(f"DROP TRIGGER IF EXISTS {UPDATE_TRIGGER} ON contacts;")
+    op.execute("DROP FUNCTION IF EXISTS contact_counts_after_update();")
+    op.execute(PREVIOUS_DELETE_TRIGGER_FUNC)
+    op.execute(PREVIOUS_INSERT_TRIGGER_FUNC)
+    op.drop_column("contact_counts", "change_count")
@@ -0,0 +1,45 @@
+"""add_contact_tombstones
+
+Revision ID: e2d6b8a4c013
+Revises: c9a4f1e27d68
+Create Date: 2026-10-18 15:02:44.630871
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2d6b8a4c013"
+down_revision: Union[str, None] = "c9a4f1e27d68"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "contact_tombstones",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("contact_id", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_contact_tombstones_user_id_deleted_at_id",
+        "contact_tombstones",
+        ["user_id", "deleted_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_contact_tombstones_user_id_deleted_at_id", table_name="contact_tombstones"
+    )
+    op.drop_table("contact_tombstones")
@@ -0,0 +1,101 @@
+"""add_contact_counts
+
+Revision ID: f7b3c5d9e281
+Revises: e2d6b8a4c013
+Create Date: 2026-10-18 16:10:29.452719
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f7b3c5d9e281"
+down_revision: Union[str, None] = "e2d6b8a4c013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INSERT_TRIGGER_FUNC = """
+CREATE OR REPLACE FUNCTION contact_counts_after_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO contact_counts (user_id, contact_count)
+    SELECT user_id, count(*) FROM new_contacts GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET contact_count = contact_counts.contact_count + EXCLUDED.contact_count;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+"""
+
+DELETE_TRIGGER_FUNC = """
+CREATE OR REPLACE FUNCTION contact_counts_after_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE contact_counts
+    SET contact_count = contact_counts.contact_count - deleted.n
+    FROM (
+        SELECT user_id, count(*) AS n FROM old_contacts GROUP BY user_id
+    ) AS deleted
+    WHERE contact_counts.user_id = deleted.user_id;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+"""
+
+INSERT_TRIGGER = "trigger_contact_counts_insert"
+DELETE_TRIGGER = "trigger_contact_counts_delete"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "contact_counts",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("contact_count", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    # Statement-level triggers with transition tables keep bulk imports and
+    # batch deletes to one counter update per user per statement.
+    op.execute(INSERT_TRIGGER_FUNC)
+    op.execute(DELETE_TRIGGER_FUNC)
+    op.execute(
+        f"""
+        CREATE TRIGGER {INSERT_TRIGGER}
+        AFTER INSERT ON contacts
+        REFERENCING NEW TABLE AS new_contacts
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION contact_counts_after_insert();
+    """
+    )
+    op.execute(
+        f"""
+        CREATE TRIGGER {DELETE_TRIGGER}
+        AFTER DELETE ON contacts
+        REFERENCING OLD TABLE AS old_contacts
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION contact_counts_after_delete();
+    """
+    )
+
+    op.execute(
+        """
+        INSERT INTO contact_counts (user_id, contact_count)
+        SELECT user_id, count(*) FROM contacts GROUP BY user_id;
+    """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"DROP TRIGGER IF EXISTS {DELETE_TRIGGER} ON contacts;")
+    op.execute(f"DROP TRIGGER IF EXISTS {INSERT_TRIGGER} ON contacts;")
+    op.execute("DROP FUNCTION IF EXISTS contact_counts_after_delete();")
+    op.execute("DROP FUNCTION IF EXISTS contact_counts_after_insert();")
+    op.drop_table("contact_counts")
@@ -0,0 +1,69 @@
+"""
+Measures contact list serialization throughput.
+
+Compares the path GET /contacts took before ContactListResponse, where each
+ORM Contact is validated into ContactResponse (including email validation)
+and dumped to JSON, with ContactListResponse rendering plain rows directly.
+
+    python -m benchmarks.contact_list_serialization
+"""
+
+import datetime
+import json
+import time
+
+from pydantic import TypeAdapter
+
+from src.api.responses import CONTACT_FIELDS, ContactListResponse
+from src.database.models import Contact
+from src.schemas import ContactResponse
+
+PAGE_SIZE = 100
+ROUNDS = 200
+
+
+def _rows() -> list[tuple]:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        (
+            index,
+            f"First{index}",
+            f"Last{index}",
+            f"contact{index}@example.com",
+            f"+380{index:09d}",
+            datetime.date(1990, 1, 1) + datetime.timedelta(days=index),
+            now,
+            now,
+        )
+        for index in range(PAGE_SIZE)
+    ]
+
+
+def _measure(render) -> float:
+    render()
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        render()
+    return PAGE_SIZE * ROUNDS / (time.perf_counter() - started)
+
+
+def main() -> None:
+    rows = _rows()
+    contacts = [Contact(**dict(zip(CONTACT_FIELDS, row))) for row in rows]
+    adapter = TypeAdapter(list[ContactResponse])
+
+    def validated() -> bytes:
+        # What FastAPI does with response_model: validate, dump, json.dumps.
+        models = adapter.validate_python(contacts, from_attributes=True)
+        return json.dumps(adapter.dump_python(models, mode="json")).encode()
+
+    def plain_rows() -> bytes:
+        return ContactListResponse(rows).body
+
+    assert json.loads(validated()) == json.loads(plain_rows())
+    for name, render in (("validated", validated), ("plain rows", plain_rows)):
+        print(f"{name:>10}: {_measure(render):,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
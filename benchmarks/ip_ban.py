@@ -0,0 +1,126 @@
+"""
+Measures banned-address lookups and the per-request cost of the ban check.
+
+Lookups: IPBanList against a linear scan over ipaddress networks, for
+BANNED_RANGES random /24 ranges. Per request: a trivial app wrapped in the
+old @app.middleware("http") check (BaseHTTPMiddleware) and in
+IPBanMiddleware, driven directly through ASGI.
+
+    python -m benchmarks.ip_ban
+"""
+
+import asyncio
+import random
+import time
+from ipaddress import ip_address, ip_network
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from src.middleware import IPBanList, IPBanMiddleware
+
+BANNED_RANGES = 30_000
+LOOKUPS = 100_000
+LINEAR_LOOKUPS = 20
+REQUESTS = 5_000
+
+
+def _per_call(func, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def bench_lookups() -> None:
+    rng = random.Random(0)
+    entries = [
+        f"{rng.randrange(1, 224)}.{rng.randrange(256)}.{rng.randrange(256)}.0/24"
+        for _ in range(BANNED_RANGES)
+    ]
+    hosts = [
+        f"{rng.randrange(1, 224)}.{rng.randrange(256)}."
+        f"{rng.randrange(256)}.{rng.randrange(256)}"
+        for _ in range(1024)
+    ]
+    banned = IPBanList(entries)
+    networks = [ip_network(entry) for entry in entries]
+
+    index = iter(range(10**9))
+
+    def interval_lookup() -> bool:
+        return hosts[next(index) % 1024] in banned
+
+    def linear_lookup() -> bool:
+        address = ip_address(hosts[next(index) % 1024])
+        return any(address in network for network in networks)
+
+    print(f"lookup among {BANNED_RANGES:,} ranges:")
+    print(f"  linear scan: {_per_call(linear_lookup, LINEAR_LOOKUPS):10.1f} us")
+    print(f"  IPBanList:   {_per_call(interval_lookup, LOOKUPS):10.1f} us")
+
+
+async def _requests(app, count: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("203.0.113.7", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(count):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / count * 1e6
+
+
+async def bench_requests() -> None:
+    banned = ["91.218.114.206", "46.17.46.213"]
+
+    async def home(request):
+        return PlainTextResponse("ok")
+
+    async def old_ban_check(request, call_next):
+        if request.client and request.client.host:
+            ip = ip_address(request.client.host)
+            if ip in banned:
+                return PlainTextResponse("banned", status_code=403)
+        return await call_next(request)
+
+    routes = [Route("/", home)]
+    apps = {
+        "none": Starlette(routes=routes),
+        "BaseHTTPMiddleware": Starlette(
+            routes=routes,
+            middleware=[Middleware(BaseHTTPMiddleware, dispatch=old_ban_check)],
+        ),
+        "IPBanMiddleware": Starlette(
+            routes=routes, middleware=[Middleware(IPBanMiddleware, banned=banned)]
+        ),
+    }
+    print("time per request, trivial endpoint:")
+    for name, app in apps.items():
+        print(f"  {name + ':':<20} {await _requests(app, REQUESTS):6.1f} us")
+
+
+if __name__ == "__main__":
+    bench_lookups()
+    asyncio.run(bench_requests())
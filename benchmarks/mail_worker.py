@@ -0,0 +1,111 @@
+"""
+Compares mail throughput with one SMTP connection per message and through
+MailWorker's pooled, persistent connections.
+
+Sends MESSAGES messages to a local aiosmtpd server, CONNECTIONS at a time.
+The server waits SESSION_SETUP_SECONDS before answering EHLO, standing in
+for the TLS handshake and AUTH round trips a real relay costs per session.
+
+    python -m benchmarks.mail_worker
+"""
+
+import asyncio
+import socket
+import time
+from email.message import EmailMessage
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+
+from src.services.mail_worker import MailWorker
+
+MESSAGES = 500
+CONNECTIONS = 4
+SESSION_SETUP_SECONDS = 0.02
+
+
+class _Handler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(SESSION_SETUP_SECONDS)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def _message(index: int) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "app@example.com"
+    message["To"] = f"user{index}@example.com"
+    message["Subject"] = "Confirm your email"
+    message.set_content("Follow the link to confirm your email.")
+    return message
+
+
+async def _per_message(port: int) -> int:
+    pending = iter(range(MESSAGES))
+
+    async def sender() -> None:
+        for index in pending:
+            await aiosmtplib.send(_message(index), hostname="127.0.0.1", port=port)
+
+    await asyncio.gather(*(sender() for _ in range(CONNECTIONS)))
+    return MESSAGES
+
+
+async def _pooled(port: int) -> int:
+    worker = MailWorker(
+        hostname="127.0.0.1",
+        port=port,
+        username=None,
+        password=None,
+        use_tls=False,
+        start_tls=False,
+        validate_certs=False,
+        connections=CONNECTIONS,
+        queue_size=MESSAGES,
+        max_attempts=1,
+        retry_base=1.0,
+        retry_max=1.0,
+        messages_per_connection=100,
+        idle_timeout=60.0,
+        timeout=30.0,
+    )
+    worker.start()
+    for index in range(MESSAGES):
+        worker.enqueue(_message(index))
+    await worker.stop(drain_timeout=600.0)
+    if worker.sent != MESSAGES:
+        raise RuntimeError(f"MailWorker sent {worker.sent} of {MESSAGES} messages")
+    return worker.sessions
+
+
+async def main() -> None:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = _Handler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        for name, send in (("per message", _per_message), ("MailWorker", _pooled)):
+            received = handler.received
+            started = time.perf_counter()
+            sessions = await send(port)
+            elapsed = time.perf_counter() - started
+            assert handler.received - received == MESSAGES
+            print(
+                f"{name:>12}: {MESSAGES} messages in {elapsed:.2f}s, "
+                f"{MESSAGES / elapsed:6.0f} msg/s over {sessions} SMTP sessions"
+            )
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Measures GET /contacts latency on a worker that is also serving a login storm.
+
+A FastAPI app with a login route that verifies a bcrypt hash and a contact
+list route that waits DB_ROUND_TRIP seconds (standing in for the query) and
+renders a page with ContactListResponse is driven directly through ASGI, in
+one event loop like one uvicorn worker. LOGIN_CLIENTS clients log in back to
+back while another client reads the contact list for STORM_SECONDS. Its
+latency is reported with no logins, with bcrypt inline on the event loop (as
+AuthService did before password hashing moved to an executor) and through
+PasswordHasher.
+
+    python -m benchmarks.password_hashing
+"""
+
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.contact_list_serialization import _rows
+from src.api.responses import ContactListResponse
+from src.services.password_hasher import PasswordHasher, _hash, _verify
+
+LOGIN_CLIENTS = 4
+STORM_SECONDS = 20.0
+DB_ROUND_TRIP = 0.001
+
+
+def _app(verify) -> FastAPI:
+    app = FastAPI()
+    hashed = _hash("secret")
+    rows = _rows()
+
+    @app.post("/login")
+    async def login():
+        return {"ok": await verify("secret", hashed)}
+
+    @app.get("/contacts")
+    async def contacts():
+        await asyncio.sleep(DB_ROUND_TRIP)
+        return ContactListResponse(rows)
+
+    return app
+
+
+async def _inline_verify(password: str, hashed: str) -> bool:
+    return _verify(password, hashed)
+
+
+async def _run(verify, login_clients: int) -> dict:
+    transport = httpx.ASGITransport(app=_app(verify))
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        stop = asyncio.Event()
+        logins = 0
+
+        async def log_in() -> None:
+            nonlocal logins
+            while not stop.is_set():
+                response = await client.post("/login")
+                response.raise_for_status()
+                logins += 1
+                # A real client's next request arrives over the socket; without
+                # a yield here the inline storm would never let readers in.
+                await asyncio.sleep(0)
+
+        storm = [asyncio.create_task(log_in()) for _ in range(login_clients)]
+        await client.get("/contacts")
+        latencies = []
+        started = time.perf_counter()
+        while time.perf_counter() - started < STORM_SECONDS:
+            request_started = time.perf_counter()
+            response = await client.get("/contacts")
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - request_started)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*storm)
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "requests": len(latencies),
+        "logins_per_second": logins / elapsed,
+    }
+
+
+async def main() -> None:
+    hasher = PasswordHasher("process", max_workers=2, max_pending=64)
+    await hasher.verify("warm", _hash("warm"))
+    try:
+        for name, verify, login_clients in (
+            ("no logins", hasher.verify, 0),
+            ("inline", _inline_verify, LOGIN_CLIENTS),
+            ("executor", hasher.verify, LOGIN_CLIENTS),
+        ):
+            result = await _run(verify, login_clients)
+            print(
+                f"{name:>9}: GET /contacts p50 {result['p50_ms']:7.1f}ms "
+                f"p99 {result['p99_ms']:7.1f}ms max {result['max_ms']:7.1f}ms "
+                f"over {result['requests']:4} requests, "
+                f"{result['logins_per_second']:5.1f} logins/s"
+            )
+    finally:
+        hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+Compares the direct and PgBouncer engine configurations under concurrency.
+
+Runs CONCURRENCY tasks that each open a session and read a page of contacts
+TRANSACTIONS times, once with the engine DB_POOLER_MODE=direct builds and once
+with the one DB_POOLER_MODE=pgbouncer builds, with and without
+DB_POOLER_PREPARED_STATEMENTS. Point BENCH_DIRECT_URL at Postgres and
+BENCH_POOLER_URL at PgBouncer in transaction mode; both default to the
+configured database.
+
+    BENCH_POOLER_URL=postgresql+asyncpg://...:6432/db python -m benchmarks.pooler_mode
+"""
+
+import asyncio
+import os
+import statistics
+import time
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.conf.config import settings
+from src.database import db
+from src.database.models import User
+from src.repository import ContactRepository
+
+CONCURRENCY = 20
+TRANSACTIONS = 50
+
+
+async def _worker(engine: AsyncEngine, user: User, latencies: list[float]) -> None:
+    session_maker = db._make_session_maker(engine)
+    for _ in range(TRANSACTIONS):
+        started = time.perf_counter()
+        async with session_maker() as session:
+            await ContactRepository(session).get_contacts(0, 50, None, None, None, user)
+        latencies.append(time.perf_counter() - started)
+
+
+async def _run(name: str, engine: AsyncEngine) -> None:
+    user = User(id=1)
+    latencies: list[float] = []
+    try:
+        await _worker(engine, user, [])
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(_worker(engine, user, latencies) for _ in range(CONCURRENCY))
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        await engine.dispose()
+    latencies.sort()
+    print(
+        f"{name:>22}: {len(latencies) / elapsed:7.0f} tx/s, "
+        f"p50 {statistics.median(latencies) * 1000:6.1f}ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.1f}ms"
+    )
+
+
+async def main() -> None:
+    direct_url = os.environ.get("BENCH_DIRECT_URL", settings.SQLALCHEMY_DATABASE_URL)
+    pooler_url = os.environ.get("BENCH_POOLER_URL", settings.SQLALCHEMY_DATABASE_URL)
+
+    settings.DB_POOLER_MODE = "direct"
+    await _run("direct", db._create_engine(direct_url))
+
+    settings.DB_POOLER_MODE = "pgbouncer"
+    for prepared in (False, True):
+        settings.DB_POOLER_PREPARED_STATEMENTS = prepared
+        name = "pgbouncer, prepared" if prepared else "pgbouncer, unprepared"
+        await _run(name, db._create_engine(pooler_url))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
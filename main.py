@@ -1,16 +1,22 @@
-from ipaddress import ip_address
-from typing import Callable
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 import cloudinary
-from fastapi import FastAPI, Request, status
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import JSONResponse
 
-from slowapi.errors import RateLimitExceeded
-
-from src.services import limiter
+from src.services import limiter, mail_worker, password_hasher, tombstone_pruner
 from src.api import contact_router, health_router, auth_router, user_router
+from src.cache import response_cache
 from src.conf.config import settings
+from src.database.db import session_manager
+from src.middleware import (
+    IPBanMiddleware,
+    LoadSheddingMiddleware,
+    ReadYourWritesMiddleware,
+    admission_controller,
+)
+from src.repository import prime_hot_queries
 
 cloudinary.config(
     cloud_name=settings.CLOUDINARY_API_NAME,
@@ -20,42 +26,56 @@ cloudinary.config(
 )
 
 origins = settings.ALLOWED_ORIGINS
-banned_ips = settings.BANNED_IPS
 
-app = FastAPI()
-app.state.limiter = limiter
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Creates the database engines and warms their pools in the background while
+    the app starts serving (see /utils/ready) and starts the mail worker and
+    the tombstone pruner; on shutdown, drains queued mail, disposes the
+    engines and releases worker pools.
+    """
+    session_manager.init(settings.SQLALCHEMY_DATABASE_URL, settings.DB_REPLICA_URLS)
+    mail_worker.start()
+    tombstone_pruner.start()
+    warm_up = asyncio.create_task(
+        session_manager.warm_up(settings.DB_WARMUP_CONNECTIONS, prime_hot_queries)
+    )
+    yield
+    warm_up.cancel()
+    with suppress(asyncio.CancelledError):
+        await warm_up
+    await tombstone_pruner.stop()
+    await mail_worker.stop()
+    await session_manager.close()
+    await limiter.close()
+    await response_cache.close()
+    password_hasher.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+# Added first so it runs innermost: shed responses still get CORS headers.
+if settings.LOAD_SHED_ENABLED:
+    app.add_middleware(LoadSheddingMiddleware, controller=admission_controller)
+if settings.DB_REPLICA_URLS:
+    app.add_middleware(
+        ReadYourWritesMiddleware, window=settings.DB_READ_YOUR_WRITES_SECONDS
+    )
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
+)
+app.add_middleware(
+    IPBanMiddleware,
+    banned=settings.BANNED_IPS,
+    path=settings.BANNED_IPS_FILE,
+    reload_seconds=settings.BANNED_IPS_RELOAD_SECONDS,
 )
-
-
-@app.middleware("http")
-async def ban_ips_middleware(request: Request, call_next: Callable):
-    if request.client and request.client.host:
-        try:
-            ip = ip_address(request.client.host)
-            if ip in banned_ips:
-                return JSONResponse(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    content={"detail": "You are banned from accessing this resource."},
-                )
-        except ValueError:
-            pass
-    response = await call_next(request)
-    return response
-
-
-@app.exception_handler(RateLimitExceeded)
-async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
-    """Custom handler for rate limit exceeded errors."""
-    return JSONResponse(
-        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-        content={"detail": "Too many requests. Please try again later"},
-    )
 
 
 app.include_router(auth_router, prefix="/api/v1")
@@ -1,33 +1,142 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from datetime import date
+from typing import Awaitable, Callable, Iterable, List, Literal
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Depends,
+    status,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
 
-from src.schemas import ContactUpdate, ContactBase, ContactResponse
-from src.services import ContactService, get_contact_service, get_current_user
+from src.schemas import (
+    ContactUpdate,
+    ContactBase,
+    ContactResponse,
+    ContactImportReport,
+    ContactChanges,
+    ContactBatchRequest,
+    ContactBatchResponse,
+)
+from src.services.etag import make_etag, etag_matches
+from src.services import (
+    ContactService,
+    get_contact_service,
+    get_read_contact_service,
+    get_current_user,
+)
+from src.api.responses import ContactListResponse
+from src.cache import response_cache, single_flight
+from src.database.db import session_manager
 from src.database.models import User
 
 contact_router = APIRouter(prefix="/contacts", tags=["contacts"])
 
 
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+async def _render_once(
+    user: User,
+    route: str,
+    params: Iterable[tuple[str, str]],
+    render: Callable[[], Awaitable[Response]],
+) -> Response:
+    """
+    Runs `render` once for concurrent identical requests (same user, route and
+    query parameters) and gives each request its own copy of the response, as
+    middleware may modify the headers of the response it sends.
+
+    ContactService invalidates the user's flights on every write, so requests
+    made after a write do not join a read that started before it.
+    """
+
+    async def payload() -> tuple[bytes, dict[str, str]]:
+        response = await render()
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in ("content-length", "content-type")
+        }
+        return response.body, headers
+
+    key = (route, tuple(sorted(params)))
+    body, headers = await single_flight.do(key, payload, scope=user.id)
+    return Response(content=body, headers=headers, media_type="application/json")
+
+
 @contact_router.get(
     "/", response_model=List[ContactResponse], summary="Get all contacts"
 )
 async def get_contacts(
+    request: Request,
     current_user: User = Depends(get_current_user),
     first_name: str | None = None,
     last_name: str | None = None,
     email: str | None = None,
+    q: str | None = Query(default=None, min_length=3, max_length=100),
     skip: int = 0,
     limit: int = Query(default=10, ge=1, le=100),
-    contact_service: ContactService = Depends(get_contact_service),
+    cursor: str | None = None,
+    include_total: bool = False,
+    contact_service: ContactService = Depends(get_read_contact_service),
 ):
     """
-    Retrieves a list of contacts for the current user.
-    Can be filtered by first name, last name, or email.
+    Retrieves a list of contacts for the current user, ordered by last name,
+    first name and id. Can be filtered by first name, last name, or email.
+
+    `q` (at least 3 characters, the trigram size) searches first name, last
+    name and email at once and orders the results by similarity to the search
+    term; these results are paged with `skip` only.
+
+    When a page is full, the `X-Next-Cursor` header carries an opaque cursor;
+    pass it back as `cursor` to fetch the next page by keyset instead of `skip`.
+
+    With `include_total`, the `X-Total-Count` header holds the number of
+    contacts matching the filters.
     """
-    contacts = await contact_service.get_contacts(
-        skip, limit, first_name, last_name, email, current_user
-    )
-    return contacts
+    params = request.query_params.multi_items()
+    etag = None
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await contact_service.get_contacts_etag(
+            current_user, "contacts:list", params
+        )
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+
+    cached = await response_cache.lookup(current_user.id, "contacts:list", params)
+    if cached.response is not None:
+        return cached.response
+
+    async def render() -> Response:
+        list_etag = etag or await contact_service.get_contacts_etag(
+            current_user, "contacts:list", params
+        )
+        contacts, next_cursor, total = await contact_service.get_contacts(
+            skip,
+            limit,
+            first_name,
+            last_name,
+            email,
+            current_user,
+            cursor,
+            q,
+            include_total,
+        )
+        headers = {"ETag": list_etag}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        if total is not None:
+            headers["X-Total-Count"] = str(total)
+        response = ContactListResponse(contacts, headers=headers)
+        await response_cache.store(cached, response)
+        return response
+
+    return await _render_once(current_user, "contacts:list", params, render)
 
 
 @contact_router.get(
@@ -36,29 +145,174 @@ async def get_contacts(
     summary="Get upcoming birthdays",
 )
 async def get_upcoming_birthdays(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    days: int = Query(default=7, ge=1, le=366),
+    contact_service: ContactService = Depends(get_read_contact_service),
+):
+    """
+    Retrieves contacts with birthdays in the next `days` days (today included)
+    for the current user, soonest first.
+    """
+    # The window moves with the date, so the date is part of the cache key.
+    params = [*request.query_params.multi_items(), ("date", date.today().isoformat())]
+    etag = None
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await contact_service.get_contacts_etag(
+            current_user, "contacts:birthdays", params
+        )
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+
+    cached = await response_cache.lookup(current_user.id, "contacts:birthdays", params)
+    if cached.response is not None:
+        return cached.response
+
+    async def render() -> Response:
+        list_etag = etag or await contact_service.get_contacts_etag(
+            current_user, "contacts:birthdays", params
+        )
+        contacts = await contact_service.get_upcoming_birthdays(current_user, days)
+        response = ContactListResponse(contacts, headers={"ETag": list_etag})
+        await response_cache.store(cached, response)
+        return response
+
+    return await _render_once(current_user, "contacts:birthdays", params, render)
+
+
+@contact_router.get(
+    "/batch",
+    response_model=List[ContactResponse],
+    summary="Get contacts by IDs",
+)
+async def get_contacts_batch(
+    ids: List[int] = Query(min_length=1, max_length=100),
+    current_user: User = Depends(get_current_user),
+    contact_service: ContactService = Depends(get_read_contact_service),
+):
+    """
+    Retrieves the current user's contacts with the given IDs (`ids=1&ids=2`)
+    in one query. IDs that do not exist or belong to another user are omitted.
+    """
+    contacts = await contact_service.get_contacts_by_ids(ids, current_user)
+    return ContactListResponse(contacts)
+
+
+@contact_router.patch(
+    "/batch",
+    response_model=ContactBatchResponse,
+    summary="Update and delete contacts in bulk",
+)
+async def batch_mutate_contacts(
+    body: ContactBatchRequest,
     current_user: User = Depends(get_current_user),
     contact_service: ContactService = Depends(get_contact_service),
 ):
-    """Retrieves contacts with birthdays in the next 7 days for the current user."""
-    contacts = await contact_service.get_upcoming_birthdays(current_user)
-    return contacts
+    """
+    Applies many partial updates and deletions in a single transaction and
+    reports `updated`, `deleted` or `not_found` for each item.
+    """
+    return await contact_service.batch_mutate_contacts(body, current_user)
+
+
+@contact_router.get(
+    "/changes", response_model=ContactChanges, summary="Get contact changes"
+)
+async def get_contact_changes(
+    current_user: User = Depends(get_current_user),
+    since: str | None = None,
+    limit: int = Query(default=500, ge=1, le=1000),
+    contact_service: ContactService = Depends(get_contact_service),
+):
+    """
+    Returns contacts created or updated and ids of contacts deleted since the
+    `since` token from a previous call; omit it for a full sync. Pass
+    `next_since` back on the next call, immediately if `has_more` is true.
+
+    Served from the primary: a lagging replica could hide changes that are
+    older than the returned token.
+    """
+    return await contact_service.get_changes(since, limit, current_user)
+
+
+@contact_router.get("/export", summary="Export contacts")
+async def export_contacts(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    export_format: Literal["csv", "ndjson"] = Query(default="ndjson", alias="format"),
+    first_name: str | None = None,
+    last_name: str | None = None,
+    email: str | None = None,
+    q: str | None = Query(default=None, min_length=3, max_length=100),
+):
+    """
+    Streams all of the current user's contacts as CSV or NDJSON, with the same
+    filters as the contact list. Rows are read through a server-side cursor, so
+    memory use does not grow with the number of contacts.
+    """
+
+    written_at = getattr(request.state, "last_write_at", None)
+
+    async def body():
+        # The request-scoped session is closed before a streamed body is sent,
+        # so the export reads through a session of its own.
+        async with session_manager.read_session(
+            current_user.id, written_at
+        ) as session:
+            contact_service = ContactService(session)
+            async for chunk in contact_service.export_contacts(
+                export_format, first_name, last_name, email, current_user, q
+            ):
+                yield chunk
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    filename = f"contacts.{export_format}"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @contact_router.get(
     "/{contact_id}", response_model=ContactResponse, summary="Get contact by ID"
 )
 async def get_contact_by_id(
+    request: Request,
     contact_id: int,
     current_user: User = Depends(get_current_user),
-    contact_service: ContactService = Depends(get_contact_service),
+    contact_service: ContactService = Depends(get_read_contact_service),
 ):
     """Retrieves a single contact by ID, if it belongs to the current user."""
-    contact = await contact_service.get_contact_by_id(contact_id, current_user)
-    if contact is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await contact_service.get_contact_etag(contact_id, current_user)
+        if etag is not None and etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+
+    params = [("id", str(contact_id))]
+    cached = await response_cache.lookup(current_user.id, "contacts:detail", params)
+    if cached.response is not None:
+        return cached.response
+
+    async def render() -> Response:
+        contact = await contact_service.get_contact_by_id(contact_id, current_user)
+        if contact is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
+            )
+        response = Response(
+            content=ContactResponse.model_validate(contact).model_dump_json(),
+            media_type="application/json",
+            headers={
+                "ETag": make_etag(current_user.id, contact.id, contact.updated_at)
+            },
         )
-    return contact
+        await response_cache.store(cached, response)
+        return response
+
+    return await _render_once(current_user, "contacts:detail", params, render)
 
 
 @contact_router.post(
@@ -79,6 +333,27 @@ async def create_contact(
     return new_contact
 
 
+@contact_router.post(
+    "/import",
+    response_model=ContactImportReport,
+    summary="Bulk import contacts",
+)
+async def import_contacts(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    contact_service: ContactService = Depends(get_contact_service),
+):
+    """
+    Imports contacts from a CSV (header row required) or NDJSON body, streamed
+    without buffering the whole upload. Rows are matched on email: existing
+    contacts are updated, new ones created. Returns per-row errors and
+    throughput figures.
+    """
+    return await contact_service.import_contacts(
+        request.stream(), request.headers.get("content-type", ""), current_user
+    )
+
+
 @contact_router.patch(
     "/{contact_id}", response_model=ContactResponse, summary="Update contact"
 )
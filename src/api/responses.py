@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Sequence
+
+from starlette.responses import Response
+
+__all__ = ["ContactListResponse", "CONTACT_FIELDS"]
+
+# Matches the fields of ContactResponse and the column order of
+# ContactRepository.CONTACT_COLUMNS.
+CONTACT_FIELDS = (
+    "id",
+    "first_name",
+    "last_name",
+    "email",
+    "phone_number",
+    "birthday",
+    "created_at",
+    "updated_at",
+)
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        # Pydantic, and so ContactResponse, writes a zero UTC offset as "Z".
+        if text.endswith("+00:00"):
+            return text[:-6] + "Z"
+        return text
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":"), default=_json_default
+)
+
+
+class ContactListResponse(Response):
+    """
+    Renders contact rows read from the database straight to JSON. The rows are
+    trusted, so they skip ContactResponse validation and model construction.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Iterable[Sequence[Any]]) -> bytes:
+        return _encoder.encode(
+            [dict(zip(CONTACT_FIELDS, row)) for row in content]
+        ).encode("utf-8")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Request, File, UploadFile
+from fastapi import APIRouter, Depends, Request, Response, File, UploadFile, status
 from fastapi.concurrency import run_in_threadpool
 
 from src.schemas import UserResponse
@@ -12,6 +12,7 @@ from src.services import (
     UserService,
 )
 from src.services import limiter
+from src.services.etag import make_etag, etag_matches
 
 user_router = APIRouter(prefix="/users", tags=["users"])
 
@@ -20,11 +21,23 @@ user_router = APIRouter(prefix="/users", tags=["users"])
     "/me",
     response_model=UserResponse,
     summary="Get Current User's Profile",
+    dependencies=[Depends(limiter.user_limit("5/minute"))],
 )
-@limiter.limit("5/minute")
 async def get_own_profile(
-    request: Request, current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
 ):
+    """
+    Returns the current user's profile. Polls that send the profile's ETag in
+    If-None-Match get 304 without re-serializing it.
+    """
+    etag = make_etag(current_user.id, current_user.updated_at)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+    response.headers["ETag"] = etag
     return current_user
 
 
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.database.db import get_db
+from src.cache import user_cache, response_cache, single_flight
+from src.conf.config import settings
+from src.database.db import get_db, session_manager
+from src.middleware import admission_controller
+from src.services.mail_worker import mail_worker
+from src.services.password_hasher import password_hasher
 
 health_router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -32,3 +39,64 @@ async def health_checker(db: AsyncSession = Depends(get_db)):
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Error connecting to the database",
         ) from e
+
+
+@health_router.get(
+    "/ready",
+    summary="Readiness Check",
+    description="Report whether database connection warm-up has succeeded.",
+)
+async def readiness():
+    """
+    Answers 503 until warm-up has succeeded. A failed warm-up is retried in
+    the background, so the worker becomes ready once the database is back.
+    """
+    state = session_manager.warm_up_state
+    if state == "failed":
+        session_manager.retry_warm_up()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database warm-up failed",
+        )
+    if state == "pending":
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database warm-up in progress",
+        )
+    return {"warm_up": state}
+
+
+async def require_metrics_token(authorization: str | None = Header(default=None)):
+    """
+    Hides the metrics endpoint unless METRICS_TOKEN is set, and then requires
+    it as a bearer token.
+    """
+    if settings.METRICS_TOKEN is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    expected = f"Bearer {settings.METRICS_TOKEN.get_secret_value()}"
+    if authorization is None or not secrets.compare_digest(
+        authorization.encode(), expected.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@health_router.get(
+    "/metrics",
+    summary="Runtime Metrics",
+    description="In-process cache, executor and pool counters for this worker.",
+    dependencies=[Depends(require_metrics_token)],
+)
+async def runtime_metrics():
+    return {
+        "db_pools": session_manager.pool_status(),
+        "user_cache": user_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "password_hasher": password_hasher.stats(),
+        "mail_worker": mail_worker.stats(),
+        "admission": admission_controller.stats(),
+    }
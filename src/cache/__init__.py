@@ -0,0 +1,28 @@
+from .ttl_cache import TTLCache
+from .user_cache import user_cache, get_cached_user, cache_user, invalidate_user
+from .response_cache import (
+    CacheBackend,
+    MemoryCacheBackend,
+    SocketCacheBackend,
+    ResponseCache,
+    CacheLookup,
+    response_cache,
+)
+from .single_flight import SingleFlight, single_flight
+
+
+__all__ = [
+    "TTLCache",
+    "user_cache",
+    "get_cached_user",
+    "cache_user",
+    "invalidate_user",
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "SocketCacheBackend",
+    "ResponseCache",
+    "CacheLookup",
+    "response_cache",
+    "SingleFlight",
+    "single_flight",
+]
@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import asyncio
+import errno
+import json
+import logging
+import math
+import os
+import socket
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from collections import deque
+from typing import Iterable
+from urllib.parse import urlencode
+
+from starlette.responses import Response
+
+from src.cache.ttl_cache import TTLCache
+from src.conf.config import settings
+
+__all__ = [
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "SocketCacheBackend",
+    "ResponseCache",
+    "CacheLookup",
+    "response_cache",
+]
+
+logger = logging.getLogger(__name__)
+
+# How long a worker skips the cache after failing to reach the shared cache
+# socket, and how long a request waits for the serving worker to answer.
+SOCKET_RETRY_SECONDS = 5.0
+SOCKET_TIMEOUT_SECONDS = 0.1
+
+
+class CacheBackend(ABC):
+    """
+    Storage used by ResponseCache. A shared implementation (e.g. over a local
+    socket or a key-value server) lets all workers see the same versions, so a
+    write on one worker invalidates cached reads on every other one. Methods
+    raise ConnectionError when the storage cannot be reached.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def get_version(self, key: str) -> int: ...
+
+    @abstractmethod
+    async def bump_version(self, key: str) -> int: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Per-process LRU backend, for single-worker deployments only. Each worker
+    holds its own entries and versions, so a write on one worker does not
+    invalidate another worker's entries: a user may read their own stale
+    data for up to RESPONSE_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries: TTLCache[str, bytes] = TTLCache(maxsize=maxsize, ttl=ttl)
+        # LRU without expiry. Evicting a version is safe: it comes back from
+        # the clock, higher than before, and only turns old entries into misses.
+        self._versions: TTLCache[str, int] = TTLCache(maxsize=maxsize, ttl=math.inf)
+
+    async def get(self, key: str) -> bytes | None:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries.set(key, value, ttl)
+
+    async def get_version(self, key: str) -> int:
+        # Versions start from the clock, so a counter that was lost (restart,
+        # eviction) never reuses an old version.
+        version = self._versions.get(key)
+        if version is None:
+            version = time.time_ns()
+            self._versions.set(key, version)
+        return version
+
+    async def bump_version(self, key: str) -> int:
+        version = await self.get_version(key) + 1
+        self._versions.set(key, version)
+        return version
+
+
+async def _dispatch(
+    backend: CacheBackend, op: str, key: str, value: bytes, ttl: float
+) -> bytes | None:
+    if op == "get":
+        return await backend.get(key)
+    if op == "set":
+        await backend.set(key, value, ttl)
+        return b""
+    if op == "version":
+        return str(await backend.get_version(key)).encode()
+    if op == "bump":
+        return str(await backend.bump_version(key)).encode()
+    raise ValueError(f"Unknown response cache operation: {op!r}")
+
+
+class SocketCacheBackend(CacheBackend):
+    """
+    Entries and versions shared by all workers on a node through a Unix
+    socket at `path` ("@name" for a Linux abstract socket), so a write on any
+    worker invalidates the user's cached responses on all of them.
+
+    As with SocketLimiterStorage, the first worker that cannot connect serves
+    a MemoryCacheBackend from its own event loop and the others pipeline
+    requests over one connection each. A request is a tab-separated line
+    `op, key, ttl, length` followed by `length` bytes of value; the answer is
+    a length line followed by that many bytes, or -1 for a missing entry. If
+    the serving worker exits, another one takes over with an empty cache.
+    """
+
+    def __init__(self, path: str, maxsize: int, ttl: float):
+        self.path = path
+        self._local = MemoryCacheBackend(maxsize, ttl)
+        self._server: asyncio.AbstractServer | None = None
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._writer: asyncio.StreamWriter | None = None
+        self._read_task: asyncio.Task | None = None
+        self._pending: deque[asyncio.Future] = deque()
+        self._connect_lock = asyncio.Lock()
+        self._retry_at = 0.0
+
+    @property
+    def _address(self) -> str:
+        if self.path.startswith("@"):
+            return "\0" + self.path[1:]
+        return self.path
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._call("get", key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._call("set", key, value, ttl)
+
+    async def get_version(self, key: str) -> int:
+        return int(await self._call("version", key))
+
+    async def bump_version(self, key: str) -> int:
+        return int(await self._call("bump", key))
+
+    async def _call(
+        self, op: str, key: str, value: bytes = b"", ttl: float = 0.0
+    ) -> bytes | None:
+        if self._server is None and self._writer is None:
+            if not await self._connect():
+                raise ConnectionError(f"Response cache socket {self.path} is down")
+        if self._server is not None:
+            return await _dispatch(self._local, op, key, value, ttl)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        self._writer.write(f"{op}\t{key}\t{ttl}\t{len(value)}\n".encode() + value)
+        try:
+            return await asyncio.wait_for(future, SOCKET_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Response cache socket %s timed out", self.path)
+            self._disconnect()
+            self._retry_at = time.monotonic() + SOCKET_RETRY_SECONDS
+            raise ConnectionError(f"Response cache socket {self.path} timed out")
+
+    async def _connect(self) -> bool:
+        async with self._connect_lock:
+            if self._writer is not None or self._server is not None:
+                return True
+            if time.monotonic() < self._retry_at:
+                return False
+            try:
+                reader, writer = await asyncio.open_unix_connection(self._address)
+            except OSError:
+                try:
+                    await self._serve()
+                    return True
+                except OSError as exc:
+                    logger.warning("Response cache socket %s: %s", self.path, exc)
+                    self._retry_at = time.monotonic() + SOCKET_RETRY_SECONDS
+                    return False
+            self._writer = writer
+            self._read_task = asyncio.create_task(self._read_responses(reader))
+            return True
+
+    async def _serve(self) -> None:
+        # Bound here rather than by start_unix_server(path=...), which would
+        # remove a socket file another worker has just bound.
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            try:
+                sock.bind(self._address)
+            except OSError as exc:
+                if exc.errno != errno.EADDRINUSE or self.path.startswith("@"):
+                    raise
+                # Only called once connecting has failed, so the file is
+                # left over from a server that exited.
+                os.unlink(self.path)
+                sock.bind(self._address)
+            self._server = await asyncio.start_unix_server(
+                self._serve_client, sock=sock
+            )
+        except OSError:
+            sock.close()
+            raise
+        logger.info("Serving the response cache on %s", self.path)
+
+    async def _serve_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._clients.add(writer)
+        try:
+            while line := await reader.readline():
+                op, key, ttl, length = line.decode().rstrip("\n").split("\t")
+                value = await reader.readexactly(int(length))
+                result = await _dispatch(self._local, op, key, value, float(ttl))
+                if result is None:
+                    writer.write(b"-1\n")
+                else:
+                    writer.write(f"{len(result)}\n".encode() + result)
+                await writer.drain()
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError) as exc:
+            logger.warning("Dropping response cache client: %s", exc)
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                length = int(line)
+                result = await reader.readexactly(length) if length >= 0 else None
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_result(result)
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError) as exc:
+            logger.warning("Response cache connection failed: %s", exc)
+        finally:
+            if self._read_task is asyncio.current_task():
+                self._read_task = None
+                self._disconnect()
+
+    def _disconnect(self) -> None:
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError("Response cache went away"))
+
+    async def close(self) -> None:
+        self._disconnect()
+        if self._server is not None:
+            # Closing the clients' connections makes another worker take over.
+            self._server.close()
+            self._server = None
+            for client in list(self._clients):
+                client.close()
+            if not self.path.startswith("@"):
+                os.unlink(self.path)
+
+
+@dataclass
+class CacheLookup:
+    key: str
+    response: Response | None
+
+
+class ResponseCache:
+    """
+    Caches rendered JSON responses per user, route and query parameters. Every
+    key embeds the user's current version; bumping it on a write makes all of
+    that user's cached responses unreachable at once.
+
+    While the backend cannot be reached, lookups miss and nothing is stored.
+    """
+
+    def __init__(self, backend: CacheBackend | None, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def lookup(
+        self, user_id: int, route: str, params: Iterable[tuple[str, str]]
+    ) -> CacheLookup:
+        """
+        Must be called before reading from the database: the version read here
+        is the one the fresh response gets stored under.
+        """
+        if self.backend is None:
+            return CacheLookup("", None)
+
+        try:
+            version = await self.backend.get_version(f"version:{user_id}")
+            key = f"response:{user_id}:{version}:{route}?{urlencode(sorted(params))}"
+            payload = await self.backend.get(key)
+        except ConnectionError:
+            # An empty key is never stored: without the current version, the
+            # response could outlive a write.
+            self.misses += 1
+            return CacheLookup("", None)
+        if payload is None:
+            self.misses += 1
+            return CacheLookup(key, None)
+
+        self.hits += 1
+        header, body = payload.split(b"\n", 1)
+        return CacheLookup(
+            key,
+            Response(
+                content=body,
+                headers=json.loads(header),
+                media_type="application/json",
+            ),
+        )
+
+    async def store(self, lookup: CacheLookup, response: Response) -> None:
+        if self.backend is None or not lookup.key or response.status_code != 200:
+            return
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in ("content-length", "content-type")
+        }
+        payload = json.dumps(headers).encode() + b"\n" + response.body
+        try:
+            await self.backend.set(lookup.key, payload, self.ttl)
+        except ConnectionError:
+            pass
+
+    async def invalidate_user(self, user_id: int) -> None:
+        if self.backend is None:
+            return
+        self.invalidations += 1
+        try:
+            await self.backend.bump_version(f"version:{user_id}")
+        except ConnectionError as exc:
+            # If the serving worker is gone, so are its entries. If it is only
+            # unreachable, other workers may serve entries cached before this
+            # write until they expire.
+            logger.warning("Cannot invalidate cache of user %s: %s", user_id, exc)
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.backend is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+        }
+
+
+def _create_backend() -> CacheBackend | None:
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    maxsize = settings.RESPONSE_CACHE_MAX_ENTRIES
+    ttl = settings.RESPONSE_CACHE_TTL_SECONDS
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(maxsize, ttl)
+    if settings.RESPONSE_CACHE_BACKEND == "socket":
+        return SocketCacheBackend(settings.RESPONSE_CACHE_SOCKET_PATH, maxsize, ttl)
+    raise ValueError(
+        f"Unknown RESPONSE_CACHE_BACKEND: {settings.RESPONSE_CACHE_BACKEND}"
+    )
+
+
+response_cache = ResponseCache(
+    _create_backend(), ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+__all__ = ["SingleFlight", "single_flight"]
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller (the
+    leader) runs its function, and callers arriving while it is in flight
+    wait for and share its result or exception.
+
+    If the leader is cancelled, e.g. because its client disconnected, the
+    waiting callers do not fail with it; one of them runs its own function
+    and leads the rest.
+
+    Calls may belong to a `scope`, e.g. a user: invalidate(scope) makes later
+    calls in that scope start a new flight instead of joining one that began
+    before the data changed.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        # Generation and number of in-flight calls per scope. A scope is
+        # forgotten once its last call finishes, as no flight can be joined.
+        self._generations: dict[Hashable, int] = {}
+        self._scope_calls: dict[Hashable, int] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[T]],
+        scope: Hashable = None,
+    ) -> T:
+        key = (scope, self._generations.get(scope, 0), key)
+        counted = False
+        while (future := self._calls.get(key)) is not None:
+            if not counted:
+                self.coalesced += 1
+                counted = True
+            # wait() leaves the shared future alone if this caller is cancelled.
+            await asyncio.wait([future])
+            if not future.cancelled():
+                return future.result()
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self._scope_calls[scope] = self._scope_calls.get(scope, 0) + 1
+        self.leaders += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Marks the exception as retrieved when nobody else was waiting.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+            self._scope_calls[scope] -= 1
+            if not self._scope_calls[scope]:
+                del self._scope_calls[scope]
+                self._generations.pop(scope, None)
+
+    def invalidate(self, scope: Hashable) -> None:
+        """Stops later calls in `scope` from joining flights already running."""
+        if scope in self._scope_calls:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Any
+
+from src.cache.ttl_cache import TTLCache
+from src.conf.config import settings
+from src.database.models import User
+
+__all__ = ["user_cache", "get_cached_user", "cache_user", "invalidate_user"]
+
+
+# Authenticated principals keyed by token subject (the user's email).
+# Only column values are stored, never the ORM instance itself, so a cached
+# entry is not bound to the session that loaded it.
+#
+# The cache is local to each worker process. invalidate_user() only clears the
+# calling worker's entry, so after a change (email verified, avatar updated)
+# other workers can keep serving the previous row for up to
+# USER_CACHE_TTL_SECONDS; that TTL is the staleness window.
+user_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def get_cached_user(email: str) -> User | None:
+    """Returns a transient User built from the cached row, or None on a miss."""
+    snapshot = user_cache.get(email)
+    if snapshot is None:
+        return None
+    return User(**snapshot)
+
+
+def cache_user(user: User) -> None:
+    snapshot = {
+        attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs
+    }
+    user_cache.set(user.email, snapshot)
+
+
+def invalidate_user(email: str) -> None:
+    user_cache.invalidate(email)
@@ -10,6 +10,26 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "contactapp-db"
     DB_HOST: str = "localhost"
     DB_PORT: int = 5432
+    # Connection pool, per engine and per worker process
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_WARMUP_CONNECTIONS: int = 5
+    # "direct", or "pgbouncer" when connecting through PgBouncer in transaction mode
+    DB_POOLER_MODE: str = "direct"
+    # PgBouncer >= 1.21 with max_prepared_statements: keeps statement caches
+    # and an app-side pool of connections to PgBouncer
+    DB_POOLER_PREPARED_STATEMENTS: bool = False
+    # Read replicas, as full SQLAlchemy URLs
+    DB_REPLICA_URLS: List[str] = []
+    DB_REPLICA_RETRY_SECONDS: float = 30.0
+    # After a write, the client's reads go to the primary for this long. The
+    # write time travels in a cookie so every worker honours it; clients that
+    # drop cookies are only covered by the worker that took the write
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
 
     @property
     def SQLALCHEMY_DATABASE_URL(self) -> str:
@@ -20,9 +40,62 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Authenticated user cache, per worker process. Updates invalidate only the
+    # worker that made them; other workers may serve the old row for up to the
+    # TTL, so keep it short
+    USER_CACHE_TTL_SECONDS: float = 10.0
+    USER_CACHE_MAX_SIZE: int = 10_000
+    # Per-user response cache for contact reads. The "memory" backend keeps
+    # entries and versions per worker process, so a write only invalidates
+    # the worker that took it: use it only when running a single worker.
+    # "socket" shares them between the workers on a node ("@name" is a Linux
+    # abstract socket); with several nodes, keep the cache disabled
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_BACKEND: str = "socket"
+    RESPONSE_CACHE_SOCKET_PATH: str = "@contacts-api-response-cache"
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10_000
+    # Delta sync: changes newer than this are held back to the next sync
+    SYNC_WATERMARK_LAG_SECONDS: float = 10.0
+    # Tombstones of deleted contacts are kept this long; sync tokens older
+    # than that are rejected and the client has to sync from scratch
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+    SYNC_TOMBSTONE_PRUNE_INTERVAL_SECONDS: float = 3600.0
+    # Password hashing executor ("process" or "thread")
+    PASSWORD_HASH_EXECUTOR: str = "process"
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    # Bulk contact import
+    BULK_IMPORT_BATCH_SIZE: int = 5_000
+    BULK_IMPORT_MAX_ERRORS: int = 1_000
+    # Rate limiting: "memory" keeps buckets per worker, "socket" shares them
+    # between the workers on a node ("@name" is a Linux abstract socket)
+    RATE_LIMIT_STORAGE: str = "memory"
+    RATE_LIMIT_SOCKET_PATH: str = "@contacts-api-rate-limiter"
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    # Admission control: concurrency is cut while DB pool checkouts wait
+    # longer than the target, and grows back one request at a time
+    LOAD_SHED_ENABLED: bool = True
+    LOAD_SHED_TARGET_WAIT_SECONDS: float = 0.05
+    LOAD_SHED_MIN_CONCURRENCY: int = 8
+    LOAD_SHED_MAX_CONCURRENCY: int = 200
+    LOAD_SHED_RETRY_AFTER_SECONDS: int = 2
+    LOAD_SHED_PRIORITY_PATHS: List[str] = ["/api/v1/utils", "/api/v1/auth"]
+    LOAD_SHED_BULK_PATHS: List[str] = [
+        "/api/v1/contacts/import",
+        "/api/v1/contacts/export",
+        "/api/v1/contacts/batch",
+    ]
+    # /utils/metrics exposes cache, pool and mail internals; it answers 404
+    # unless a token is set, and then requires "Authorization: Bearer <token>"
+    METRICS_TOKEN: SecretStr | None = None
     # CORS and IP Ban Settings
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000"]
     BANNED_IPS: List[str] = ["91.218.114.206", "46.17.46.213"]
+    # Optional file of banned addresses/CIDR ranges, one per line, re-read
+    # when its mtime changes
+    BANNED_IPS_FILE: str | None = None
+    BANNED_IPS_RELOAD_SECONDS: float = 5.0
     # Email Service Settings
     MAIL_USERNAME: str = "email@example.com"
     MAIL_PASSWORD: SecretStr = SecretStr("email_password")
@@ -34,6 +107,15 @@ class Settings(BaseSettings):
     MAIL_SSL_TLS: bool = True
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
+    # Mail worker: persistent SMTP connections fed from a bounded queue
+    MAIL_WORKER_CONNECTIONS: int = 2
+    MAIL_QUEUE_SIZE: int = 1_000
+    MAIL_MAX_ATTEMPTS: int = 5
+    MAIL_RETRY_BASE_SECONDS: float = 2.0
+    MAIL_RETRY_MAX_SECONDS: float = 300.0
+    MAIL_MESSAGES_PER_CONNECTION: int = 100
+    MAIL_IDLE_TIMEOUT_SECONDS: float = 60.0
+    MAIL_TIMEOUT_SECONDS: float = 30.0
     # Cloudinary settings
     CLOUDINARY_API_NAME: str = "pythonweb10"
     CLOUDINARY_API_KEY: str = "123456789"
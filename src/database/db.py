@@ -1,17 +1,231 @@
+import asyncio
 import contextlib
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Sequence
+from uuid import uuid4
 
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from src.conf.config import settings
+from src.database.pool_metrics import InstrumentedQueuePool
+
+logger = logging.getLogger(__name__)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    if settings.DB_POOLER_MODE == "pgbouncer":
+        return _create_pooler_engine(url)
+    if settings.DB_POOLER_MODE != "direct":
+        raise ValueError(f"Unknown DB_POOLER_MODE: {settings.DB_POOLER_MODE}")
+
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+        },
+    )
+
+
+def _create_pooler_engine(url: str) -> AsyncEngine:
+    """
+    Builds an engine for PgBouncer in transaction pooling mode. Every prepared
+    statement gets a unique name because consecutive transactions may land
+    on different server connections.
+
+    By default PgBouncer owns the pooling: the app side uses NullPool, and
+    each statement is prepared and discarded within its transaction.
+
+    DB_POOLER_PREPARED_STATEMENTS, which requires PgBouncer >= 1.21 with
+    max_prepared_statements enabled, keeps statement caches. They live on the
+    client connection, so the app side then keeps a pool of connections to
+    PgBouncer (DB_POOL_SIZE and DB_MAX_OVERFLOW); with NullPool they would be
+    dropped after every session.
+    """
+    connect_args = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": _unique_statement_name,
+    }
+    if not settings.DB_POOLER_PREPARED_STATEMENTS:
+        return create_async_engine(url, poolclass=NullPool, connect_args=connect_args)
+
+    connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def _make_session_maker(engine: AsyncEngine) -> async_sessionmaker:
+    # Objects returned by INSERT/UPDATE/DELETE ... RETURNING must stay
+    # readable after commit without another round trip to refresh them.
+    return async_sessionmaker(
+        bind=engine,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+    )
+
+
+def _pool_status(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"pool": type(pool).__name__}
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        **pool.metrics.snapshot(),
+    }
+
+
+async def _warm_up_engine(
+    session_maker: async_sessionmaker,
+    connections: int,
+    prime: Callable[[AsyncSession], Awaitable[None]] | None,
+) -> None:
+    # All sessions are held open until every one is primed, so each of them
+    # checks out a distinct connection.
+    sessions = [session_maker() for _ in range(connections)]
+    try:
+        await asyncio.gather(*(_warm_up_session(s, prime) for s in sessions))
+    finally:
+        await asyncio.gather(*(s.close() for s in sessions))
+
+
+async def _warm_up_session(
+    session: AsyncSession, prime: Callable[[AsyncSession], Awaitable[None]] | None
+) -> None:
+    await session.connection()
+    if prime is not None:
+        await prime(session)
+    await session.rollback()
+
+
+@dataclass
+class _Replica:
+    name: str
+    engine: AsyncEngine
+    session_maker: async_sessionmaker
+    down_until: float = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
 
 
 class DatabaseSessionManager:
-    def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url)
-        self._session_maker: async_sessionmaker = async_sessionmaker(
-            bind=self._engine, autoflush=False, autocommit=False
-        )
+    """
+    Owns the primary and replica engines. Engines are created by `init()` and
+    disposed by `close()`, both called from the application lifespan.
+    """
+
+    def __init__(self):
+        self._engine: AsyncEngine | None = None
+        self._session_maker: async_sessionmaker | None = None
+        self._replicas: list[_Replica] = []
+        self._replica_counter = itertools.count()
+        # user id -> monotonic deadline until which that user reads from primary
+        self._recent_writes: dict[int, float] = {}
+        # "pending" until warm_up() has run, then "done" or "failed"
+        self.warm_up_state = "pending"
+        self._warm_up_args: tuple = (0, None)
+        self._warm_up_retry: asyncio.Task | None = None
+
+    def init(self, url: str, replica_urls: Sequence[str] = ()) -> None:
+        self._engine = _create_engine(url)
+        self._session_maker = _make_session_maker(self._engine)
+        self._replicas = []
+        for index, replica_url in enumerate(replica_urls):
+            engine = _create_engine(replica_url)
+            self._replicas.append(
+                _Replica(f"replica-{index}", engine, _make_session_maker(engine))
+            )
+        self.warm_up_state = "pending"
+
+    async def close(self) -> None:
+        if self._warm_up_retry is not None:
+            self._warm_up_retry.cancel()
+            self._warm_up_retry = None
+        engines = [replica.engine for replica in self._replicas]
+        if self._engine is not None:
+            engines.append(self._engine)
+        await asyncio.gather(*(engine.dispose() for engine in engines))
+        self._engine = None
+        self._session_maker = None
+        self._replicas = []
+
+    async def warm_up(
+        self,
+        connections: int,
+        prime: Callable[[AsyncSession], Awaitable[None]] | None = None,
+    ) -> None:
+        """
+        Opens up to `connections` pooled connections on every engine and runs
+        `prime` on each, so that connection setup and statement preparation
+        for the hot queries are paid before traffic arrives.
+        """
+        self._warm_up_args = (connections, prime)
+        self.warm_up_state = "pending"
+        session_makers = [self._session_maker] + [
+            replica.session_maker for replica in self._replicas
+        ]
+        try:
+            if self._session_maker is None:
+                raise ValueError("Database session manager is not initialized")
+            if isinstance(self._engine.pool, InstrumentedQueuePool):
+                connections = min(connections, settings.DB_POOL_SIZE)
+            else:
+                # Nothing is kept without an app-side pool; a single pass still
+                # fills SQLAlchemy's compiled statement cache.
+                connections = min(connections, 1)
+            if connections > 0:
+                await asyncio.gather(
+                    *(
+                        _warm_up_engine(session_maker, connections, prime)
+                        for session_maker in session_makers
+                    )
+                )
+        except (SQLAlchemyError, OSError, ValueError) as e:
+            self.warm_up_state = "failed"
+            logger.warning("Database warm-up failed: %s", e)
+            return
+        self.warm_up_state = "done"
+
+    def retry_warm_up(self) -> None:
+        """Runs warm_up() again in the background after it has failed."""
+        if self.warm_up_state != "failed":
+            return
+        if self._warm_up_retry is None or self._warm_up_retry.done():
+            self._warm_up_retry = asyncio.create_task(self.warm_up(*self._warm_up_args))
 
     @contextlib.asynccontextmanager
     async def session(self):
@@ -26,8 +240,115 @@ class DatabaseSessionManager:
         finally:
             await session.close()
 
+    def mark_write(self, user_id: int) -> None:
+        """
+        Pins the user's reads to the primary for DB_READ_YOUR_WRITES_SECONDS,
+        so that replica lag never hides the user's own changes.
+
+        This window only lives in the current worker process. Reads served by
+        other workers rely on the write time the client sends back, which
+        ReadYourWritesMiddleware keeps in a cookie (see read_session()).
+        """
+        now = time.monotonic()
+        if len(self._recent_writes) > 10_000:
+            self._recent_writes = {
+                uid: deadline
+                for uid, deadline in self._recent_writes.items()
+                if deadline > now
+            }
+        self._recent_writes[user_id] = now + settings.DB_READ_YOUR_WRITES_SECONDS
+
+    def _reads_from_primary(
+        self, user_id: int | None, written_at: float | None
+    ) -> bool:
+        if not self._replicas:
+            return True
+        if (
+            written_at is not None
+            and 0.0 <= time.time() - written_at < settings.DB_READ_YOUR_WRITES_SECONDS
+        ):
+            return True
+        if user_id is None:
+            return False
+        return self._recent_writes.get(user_id, 0.0) > time.monotonic()
+
+    async def _open_replica_session(self) -> AsyncSession | None:
+        """
+        Opens a session on the next healthy replica, round-robin. A replica
+        that fails to hand out a connection is skipped for
+        DB_REPLICA_RETRY_SECONDS; returns None if no replica is usable.
+        """
+        start = next(self._replica_counter)
+        for offset in range(len(self._replicas)):
+            replica = self._replicas[(start + offset) % len(self._replicas)]
+            if not replica.healthy:
+                continue
+            session = replica.session_maker()
+            try:
+                await session.connection()
+                return session
+            except (SQLAlchemyError, OSError) as e:
+                await session.close()
+                replica.down_until = (
+                    time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+                )
+                logger.warning("Replica %s is unavailable: %s", replica.name, e)
+        return None
+
+    @contextlib.asynccontextmanager
+    async def read_session(
+        self, user_id: int | None = None, written_at: float | None = None
+    ):
+        """
+        Yields a session for read-only work. It is served by a replica when one
+        is configured and healthy, and by the primary otherwise or while the
+        client is inside its read-your-writes window: either this worker took
+        a write from `user_id` recently, or `written_at`, the wall-clock time
+        of the client's last write as reported by the client, is less than
+        DB_READ_YOUR_WRITES_SECONDS ago.
+        """
+        session = None
+        if not self._reads_from_primary(user_id, written_at):
+            session = await self._open_replica_session()
+        if session is None:
+            async with self.session() as primary_session:
+                yield primary_session
+            return
+
+        try:
+            yield session
+        except SQLAlchemyError:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    def pool_wait_seconds(self) -> float:
+        """The highest recent checkout wait across the primary and replicas."""
+        engines = [self._engine] if self._engine is not None else []
+        engines += [replica.engine for replica in self._replicas]
+        return max(
+            (
+                engine.pool.metrics.recent_wait()
+                for engine in engines
+                if isinstance(engine.pool, InstrumentedQueuePool)
+            ),
+            default=0.0,
+        )
+
+    def pool_status(self) -> dict:
+        status = {}
+        if self._engine is not None:
+            status["primary"] = _pool_status(self._engine)
+        for replica in self._replicas:
+            status[replica.name] = {
+                **_pool_status(replica.engine),
+                "healthy": replica.healthy,
+            }
+        return status
+
 
-session_manager = DatabaseSessionManager(settings.SQLALCHEMY_DATABASE_URL)
+session_manager = DatabaseSessionManager()
 
 
 async def get_db():
@@ -1,6 +1,16 @@
 from .base_model import metadata_obj, MinimalBase, IDOrmModel
 from .contact_model import Contact
 from .user_model import User
+from .contact_tombstone_model import ContactTombstone
+from .contact_count_model import ContactCount
 
 
-__all__ = ["metadata_obj", "MinimalBase", "IDOrmModel", "Contact", "User"]
+__all__ = [
+    "metadata_obj",
+    "MinimalBase",
+    "IDOrmModel",
+    "Contact",
+    "User",
+    "ContactTombstone",
+    "ContactCount",
+]
@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base_model import MinimalBase
+
+
+class ContactCount(MinimalBase):
+    """
+    Number of contacts per user, maintained by statement-level triggers on
+    contacts so that unfiltered listings can report a total without counting.
+    `change_count` is bumped by every statement that inserts, updates or
+    deletes any of the user's contacts, which makes it a version for list
+    ETags.
+    """
+
+    __tablename__ = "contact_counts"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    contact_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    change_count: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0", nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<ContactCount(user_id={self.user_id}, contact_count={self.contact_count})>"
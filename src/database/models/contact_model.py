@@ -2,7 +2,21 @@ from __future__ import annotations
 from datetime import date, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, Date, DateTime, func, UniqueConstraint, ForeignKey
+from sqlalchemy import (
+    ColumnElement,
+    String,
+    Date,
+    SmallInteger,
+    DateTime,
+    cast,
+    extract,
+    func,
+    literal_column,
+    UniqueConstraint,
+    ForeignKey,
+    Index,
+)
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base_model import IDOrmModel
@@ -15,6 +29,37 @@ class Contact(IDOrmModel):
     __tablename__ = "contacts"
     __table_args__ = (
         UniqueConstraint("user_id", "email", name="unique_contact_user_email"),
+        Index(
+            "ix_contacts_user_id_last_name_first_name_id",
+            "user_id",
+            "last_name",
+            "first_name",
+            "id",
+        ),
+        Index(
+            "ix_contacts_user_id_updated_at_id", "user_id", "updated_at", "id"
+        ),
+        Index(
+            "ix_contacts_user_id_first_name_trgm",
+            "user_id",
+            "first_name",
+            postgresql_using="gin",
+            postgresql_ops={"first_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_contacts_user_id_last_name_trgm",
+            "user_id",
+            "last_name",
+            postgresql_using="gin",
+            postgresql_ops={"last_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_contacts_user_id_email_trgm",
+            "user_id",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
     )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -44,5 +89,30 @@ class Contact(IDOrmModel):
     # Relationships
     user: Mapped[User] = relationship(back_populates="contacts")
 
+    @hybrid_property
+    def birthday_mmdd(self) -> int | None:
+        """
+        Month * 100 + day of the birthday (e.g. 229 for Feb 29). In SQL this is
+        the expression indexed by ix_contacts_user_id_birthday_mmdd, so
+        upcoming-birthday windows become range scans.
+        """
+        if self.birthday is None:
+            return None
+        return self.birthday.month * 100 + self.birthday.day
+
+    @birthday_mmdd.inplace.expression
+    @classmethod
+    def _birthday_mmdd_expression(cls) -> ColumnElement[int]:
+        # The multiplier is rendered inline: a bound parameter would keep the
+        # planner from matching the indexed expression.
+        return cast(
+            extract("month", cls.birthday) * literal_column("100")
+            + extract("day", cls.birthday),
+            SmallInteger,
+        )
+
     def __repr__(self) -> str:
         return f"<Contact(id={self.id}, first_name='{self.first_name}', last_name='{self.last_name}', email='{self.email}', phone_number='{self.phone_number}', birthday='{self.birthday}', user_id='{self.user_id}')>"
+
+
+Index("ix_contacts_user_id_birthday_mmdd", Contact.user_id, Contact.birthday_mmdd)
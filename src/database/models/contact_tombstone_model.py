@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base_model import IDOrmModel
+
+
+class ContactTombstone(IDOrmModel):
+    """Records a deleted contact so sync clients can learn about the deletion."""
+
+    __tablename__ = "contact_tombstones"
+    __table_args__ = (
+        Index(
+            "ix_contact_tombstones_user_id_deleted_at_id",
+            "user_id",
+            "deleted_at",
+            "id",
+        ),
+        # Serves the retention sweep, which deletes across all users.
+        Index("ix_contact_tombstones_deleted_at", "deleted_at"),
+    )
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    contact_id: Mapped[int] = mapped_column(nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<ContactTombstone(id={self.id}, contact_id={self.contact_id}, user_id={self.user_id})>"
@@ -0,0 +1,255 @@
+"""
+Helpers for Alembic migrations that must not block traffic on large tables.
+
+Postgres holds the lock taken by DDL until the surrounding transaction ends,
+so a migration that adds a column, backfills it and sets NOT NULL in one
+transaction keeps the table locked for the whole run. The helpers here split
+such changes into short steps:
+
+    add_column (nullable, no default)            brief ACCESS EXCLUSIVE
+    backfill_in_batches                          one short transaction per batch
+    create_index_concurrently                    no write lock, own transaction
+    add_foreign_key_not_valid / add_check_not_valid
+    validate_constraint                          SHARE UPDATE EXCLUSIVE only
+    set_not_null                                 NOT NULL without a table scan
+
+Steps that need their own transactions run in Alembic's autocommit block, so
+everything the migration did before them is committed first. Such migrations
+should keep the locking DDL at the start and the long-running steps after
+it. Every step can be re-run after a failure. `SET LOCAL` does not reach
+into the autocommit block, so those steps set a session lock_timeout of
+their own and reset it afterwards.
+
+These helpers need a live connection and cannot be used with `alembic
+upgrade --sql`.
+"""
+
+import contextlib
+import logging
+import time
+from typing import Iterator, Sequence
+
+from alembic import op
+from sqlalchemy import TextClause, text
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "set_lock_timeout",
+    "create_index_concurrently",
+    "drop_index_concurrently",
+    "add_foreign_key_not_valid",
+    "add_check_not_valid",
+    "validate_constraint",
+    "set_not_null",
+    "backfill_in_batches",
+]
+
+BACKFILL_BATCH_SIZE = 5_000
+BACKFILL_PAUSE_SECONDS = 0.1
+LOCK_TIMEOUT_MS = 5_000
+
+
+def _quote(name: str) -> str:
+    return op.get_bind().dialect.identifier_preparer.quote(name)
+
+
+def set_lock_timeout(milliseconds: int = LOCK_TIMEOUT_MS) -> None:
+    """
+    Makes DDL in the current transaction give up after `milliseconds` of
+    waiting for its lock instead of queueing every query behind it. It ends
+    with the migration's transaction; the helpers that run in an autocommit
+    block set their own.
+    """
+    op.execute(f"SET LOCAL lock_timeout = {int(milliseconds)}")
+
+
+@contextlib.contextmanager
+def _autocommit_step(lock_timeout_ms: int = LOCK_TIMEOUT_MS) -> Iterator[None]:
+    """
+    Runs the body outside the migration's transaction with a session-level
+    lock_timeout, which is reset afterwards so it does not leak into the
+    rest of the migration run on this connection.
+    """
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        bind.execute(text(f"SET lock_timeout = {int(lock_timeout_ms)}"))
+        try:
+            yield
+        finally:
+            bind.execute(text("RESET lock_timeout"))
+
+
+def _index_is_valid(index_name: str) -> bool | None:
+    result = op.get_bind().execute(
+        text(
+            "SELECT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND pg_catalog.pg_table_is_visible(c.oid)"
+        ),
+        {"name": index_name},
+    )
+    return result.scalar_one_or_none()
+
+
+def create_index_concurrently(
+    index_name: str, table_name: str, columns: Sequence[str | TextClause], **kw
+) -> None:
+    """
+    Builds an index with CREATE INDEX CONCURRENTLY, which does not block
+    writes. Extra keyword arguments are passed to `op.create_index`.
+
+    A failed concurrent build leaves an INVALID index behind; it is dropped
+    and rebuilt, while a valid index of the same name is kept.
+    """
+    with _autocommit_step():
+        valid = _index_is_valid(index_name)
+        if valid:
+            logger.info("Index %s already exists", index_name)
+            return
+        if valid is not None:
+            logger.warning("Rebuilding invalid index %s", index_name)
+            op.drop_index(index_name, table_name, postgresql_concurrently=True)
+        op.create_index(
+            index_name, table_name, list(columns), postgresql_concurrently=True, **kw
+        )
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    with _autocommit_step():
+        op.drop_index(
+            index_name, table_name, postgresql_concurrently=True, if_exists=True
+        )
+
+
+def _constraint_exists(constraint_name: str, table_name: str) -> bool:
+    result = op.get_bind().execute(
+        text(
+            "SELECT 1 FROM pg_constraint "
+            "WHERE conname = :name AND conrelid = CAST(:table AS regclass)"
+        ),
+        {"name": constraint_name, "table": table_name},
+    )
+    return result.scalar_one_or_none() is not None
+
+
+def add_foreign_key_not_valid(
+    constraint_name: str,
+    source_table: str,
+    referent_table: str,
+    local_cols: Sequence[str],
+    remote_cols: Sequence[str],
+    ondelete: str | None = None,
+) -> None:
+    """
+    Adds a foreign key that is enforced for new rows but does not scan the
+    existing ones; check them later with `validate_constraint`.
+    """
+    if _constraint_exists(constraint_name, source_table):
+        return
+    local = ", ".join(_quote(col) for col in local_cols)
+    remote = ", ".join(_quote(col) for col in remote_cols)
+    on_delete = f" ON DELETE {ondelete}" if ondelete else ""
+    op.execute(
+        f"ALTER TABLE {_quote(source_table)} "
+        f"ADD CONSTRAINT {_quote(constraint_name)} "
+        f"FOREIGN KEY ({local}) REFERENCES {_quote(referent_table)} ({remote})"
+        f"{on_delete} NOT VALID"
+    )
+
+
+def add_check_not_valid(constraint_name: str, table_name: str, condition: str) -> None:
+    """
+    Adds a CHECK constraint that is enforced for new rows but does not scan
+    the existing ones; check them later with `validate_constraint`.
+    """
+    if _constraint_exists(constraint_name, table_name):
+        return
+    op.execute(
+        f"ALTER TABLE {_quote(table_name)} "
+        f"ADD CONSTRAINT {_quote(constraint_name)} CHECK ({condition}) NOT VALID"
+    )
+
+
+def validate_constraint(constraint_name: str, table_name: str) -> None:
+    """
+    Validates a NOT VALID constraint in its own transaction. The scan holds
+    only SHARE UPDATE EXCLUSIVE, so reads and writes continue meanwhile.
+    """
+    with _autocommit_step():
+        op.execute(
+            f"ALTER TABLE {_quote(table_name)} "
+            f"VALIDATE CONSTRAINT {_quote(constraint_name)}"
+        )
+
+
+def set_not_null(table_name: str, column_name: str) -> None:
+    """
+    Sets NOT NULL on a populated column without holding ACCESS EXCLUSIVE for
+    a full table scan. A validated CHECK (column IS NOT NULL) lets Postgres
+    skip the scan when the column is altered; the check is dropped afterwards.
+    """
+    check_name = f"{table_name}_{column_name}_not_null"
+    add_check_not_valid(check_name, table_name, f"{_quote(column_name)} IS NOT NULL")
+    validate_constraint(check_name, table_name)
+    with _autocommit_step():
+        op.alter_column(table_name, column_name, nullable=False)
+        op.drop_constraint(check_name, table_name, type_="check")
+
+
+def backfill_in_batches(
+    table_name: str,
+    set_clause: str,
+    where: str,
+    params: dict | None = None,
+    batch_size: int = BACKFILL_BATCH_SIZE,
+    pause_seconds: float = BACKFILL_PAUSE_SECONDS,
+    key: str = "id",
+) -> int:
+    """
+    Runs UPDATE table_name SET `set_clause` WHERE `where` over consecutive
+    ranges of `batch_size` keys, committing each batch and sleeping
+    `pause_seconds` between them so replication and autovacuum keep up.
+
+    `where` must stop matching a row once it has been backfilled (for example
+    "user_id IS NULL"). An interrupted backfill can then simply be run again,
+    and it only rewrites the rows that are still missing. Note that row
+    triggers fire for every updated row. Returns the number of updated rows.
+    """
+    table = _quote(table_name)
+    key_column = _quote(key)
+    next_range = text(
+        f"SELECT max({key_column}) FROM ("
+        f"SELECT {key_column} FROM {table} "
+        f"WHERE {key_column} > :after ORDER BY {key_column} LIMIT :batch_size"
+        f") AS batch"
+    )
+    update_range = text(
+        f"UPDATE {table} SET {set_clause} "
+        f"WHERE {key_column} > :after AND {key_column} <= :upto AND ({where})"
+    )
+
+    total = 0
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        after = bind.execute(
+            text(f"SELECT min({key_column}) - 1 FROM {table} WHERE {where}"),
+            params or {},
+        ).scalar_one()
+        while after is not None:
+            upto = bind.execute(
+                next_range, {"after": after, "batch_size": batch_size}
+            ).scalar_one()
+            if upto is None:
+                break
+            result = bind.execute(
+                update_range, {**(params or {}), "after": after, "upto": upto}
+            )
+            total += result.rowcount
+            logger.info(
+                "Backfilled %s up to %s=%s (%d rows)", table_name, key, upto, total
+            )
+            after = upto
+            if pause_seconds:
+                time.sleep(pause_seconds)
+    return total
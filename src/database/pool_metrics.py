@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import bisect
+import math
+import time
+
+from greenlet import getcurrent
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+__all__ = ["Histogram", "PoolMetrics", "InstrumentedQueuePool"]
+
+
+class Histogram:
+    """A fixed-bucket histogram; each bucket counts values up to its bound."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{bound:g}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "max": round(self.max, 6),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class PoolMetrics:
+    # Seconds spent in Pool.connect() waiting for a connection to be checked
+    # in or for overflow room, not counting the time spent opening one.
+    WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    # Weight of the newest wait in the moving average, and the time constant
+    # with which the average decays towards zero when no checkouts happen.
+    WAIT_EWMA_ALPHA = 0.2
+    WAIT_EWMA_DECAY_SECONDS = 1.0
+
+    def __init__(self):
+        self.wait_seconds = Histogram(self.WAIT_BUCKETS)
+        self.timeouts = 0
+        self._wait_ewma = 0.0
+        self._wait_ewma_at = time.monotonic()
+        # Start times of the checkouts still waiting, oldest first.
+        self._waiting: dict[object, float] = {}
+
+    def begin_wait(self, checkout: object) -> None:
+        self._waiting[checkout] = time.monotonic()
+
+    def end_wait(self, checkout: object) -> None:
+        self._waiting.pop(checkout, None)
+
+    def observe_wait(self, seconds: float) -> None:
+        self.wait_seconds.observe(seconds)
+        now = time.monotonic()
+        average = self.recent_wait(now)
+        self._wait_ewma = average + self.WAIT_EWMA_ALPHA * (seconds - average)
+        self._wait_ewma_at = now
+
+    def recent_wait(self, now: float | None = None) -> float:
+        """
+        Moving average of recent checkout waits, in seconds, or how long the
+        oldest checkout still in progress has waited if that is longer. The
+        average only moves when a checkout finishes, so without the latter it
+        would decay towards zero while every checkout hangs.
+        """
+        if now is None:
+            now = time.monotonic()
+        elapsed = now - self._wait_ewma_at
+        average = self._wait_ewma * math.exp(-elapsed / self.WAIT_EWMA_DECAY_SECONDS)
+        oldest = next(iter(self._waiting.values()), now)
+        return max(average, now - oldest)
+
+    def snapshot(self) -> dict:
+        return {
+            "wait_seconds": self.wait_seconds.snapshot(),
+            "recent_wait_seconds": round(self.recent_wait(), 6),
+            "timeouts": self.timeouts,
+        }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    The default asyncio queue pool, timing every checkout so that pool waits
+    show up in PoolMetrics. Opening a new connection is subtracted from the
+    checkout time; it is database latency, not contention for the pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        # Seconds spent opening connections, per checkout in progress. Each
+        # checkout runs in its own greenlet and may yield while connecting.
+        self._connecting: dict[object, float] = {}
+
+    def recreate(self) -> InstrumentedQueuePool:
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _create_connection(self):
+        # Opening a connection is not waiting for the pool.
+        self.metrics.end_wait(getcurrent())
+        started = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            checkout = getcurrent()
+            if checkout in self._connecting:
+                self._connecting[checkout] += time.perf_counter() - started
+
+    def _do_get(self):
+        checkout = getcurrent()
+        self._connecting[checkout] = 0.0
+        self.metrics.begin_wait(checkout)
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.end_wait(checkout)
+            connecting = self._connecting.pop(checkout)
+            self.metrics.observe_wait(time.perf_counter() - started - connecting)
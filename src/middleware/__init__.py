@@ -0,0 +1,16 @@
+from .ip_ban import IPBanList, IPBanMiddleware
+from .load_shedding import (
+    AdmissionController,
+    LoadSheddingMiddleware,
+    admission_controller,
+)
+from .read_your_writes import ReadYourWritesMiddleware
+
+__all__ = [
+    "IPBanList",
+    "IPBanMiddleware",
+    "AdmissionController",
+    "LoadSheddingMiddleware",
+    "admission_controller",
+    "ReadYourWritesMiddleware",
+]
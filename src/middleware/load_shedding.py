@@ -0,0 +1,149 @@
+import time
+from typing import Callable, Sequence
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.conf.config import settings
+from src.database.db import session_manager
+
+__all__ = ["AdmissionController", "LoadSheddingMiddleware", "admission_controller"]
+
+PRIORITY = "priority"
+NORMAL = "normal"
+BULK = "bulk"
+
+
+class AdmissionController:
+    """
+    An AIMD concurrency limit driven by database pool queueing delay.
+
+    Every `adjust_interval` seconds, the limit is multiplied by
+    DECREASE_FACTOR while `pool_wait()` is above `target_wait`, and otherwise
+    raised by one if requests were turned away or the limit was nearly used.
+
+    Requests are admitted by class:
+    - Priority paths (health checks, auth) are always admitted.
+    - Bulk paths may use only BULK_SHARE of the limit, and are refused
+      outright while the pool is over target.
+    - Everything else may use the whole limit.
+    """
+
+    DECREASE_FACTOR = 0.9
+    BULK_SHARE = 0.5
+
+    def __init__(
+        self,
+        pool_wait: Callable[[], float],
+        target_wait: float,
+        min_limit: int,
+        max_limit: int,
+        retry_after: int,
+        priority_paths: Sequence[str] = (),
+        bulk_paths: Sequence[str] = (),
+        adjust_interval: float = 0.1,
+    ):
+        self.pool_wait = pool_wait
+        self.target_wait = target_wait
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.retry_after = retry_after
+        self.priority_paths = tuple(priority_paths)
+        self.bulk_paths = tuple(bulk_paths)
+        self.adjust_interval = adjust_interval
+
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.overloaded = False
+        self.rejected = {NORMAL: 0, BULK: 0}
+        self._rejected_since_adjust = 0
+        self._next_adjust = 0.0
+
+    def classify(self, path: str) -> str:
+        if path.startswith(self.priority_paths):
+            return PRIORITY
+        if path.startswith(self.bulk_paths):
+            return BULK
+        return NORMAL
+
+    def _adjust(self) -> None:
+        now = time.monotonic()
+        if now < self._next_adjust:
+            return
+        self._next_adjust = now + self.adjust_interval
+
+        self.overloaded = self.pool_wait() > self.target_wait
+        if self.overloaded:
+            self.limit = max(self.min_limit, self.limit * self.DECREASE_FACTOR)
+        elif self._rejected_since_adjust or self.in_flight >= self.limit - 1:
+            self.limit = min(self.max_limit, self.limit + 1)
+        self._rejected_since_adjust = 0
+
+    def try_acquire(self, path: str) -> bool:
+        """Admits a request for `path`; admitted requests must call release()."""
+        self._adjust()
+        request_class = self.classify(path)
+        if request_class == BULK:
+            admitted = (
+                not self.overloaded
+                and self.in_flight < self.limit * self.BULK_SHARE
+            )
+        else:
+            admitted = request_class == PRIORITY or self.in_flight < self.limit
+
+        if not admitted:
+            self.rejected[request_class] += 1
+            self._rejected_since_adjust += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 1),
+            "in_flight": self.in_flight,
+            "overloaded": self.overloaded,
+            "pool_wait_seconds": round(self.pool_wait(), 6),
+            "rejected": dict(self.rejected),
+        }
+
+
+class LoadSheddingMiddleware:
+    """Answers 503 with Retry-After to HTTP requests the controller refuses."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if not self.controller.try_acquire(scope["path"]):
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy. Please try again later."},
+                headers={"Retry-After": str(self.controller.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+
+admission_controller = AdmissionController(
+    pool_wait=session_manager.pool_wait_seconds,
+    target_wait=settings.LOAD_SHED_TARGET_WAIT_SECONDS,
+    min_limit=settings.LOAD_SHED_MIN_CONCURRENCY,
+    max_limit=settings.LOAD_SHED_MAX_CONCURRENCY,
+    retry_after=settings.LOAD_SHED_RETRY_AFTER_SECONDS,
+    priority_paths=settings.LOAD_SHED_PRIORITY_PATHS,
+    bulk_paths=settings.LOAD_SHED_BULK_PATHS,
+)
@@ -0,0 +1,59 @@
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+__all__ = ["ReadYourWritesMiddleware"]
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class ReadYourWritesMiddleware:
+    """
+    Carries the time of a client's last write in a cookie, so that whichever
+    worker serves its next reads can keep them on the primary.
+
+    Successful POST, PUT, PATCH and DELETE responses set the cookie to the
+    current wall-clock time, expiring after `window` seconds. On later
+    requests its value is exposed as `request.state.last_write_at` and passed
+    to DatabaseSessionManager.read_session(). Clients that drop cookies are
+    only covered by the per-process window of the worker that took the write.
+    """
+
+    cookie_name = "last_write"
+
+    def __init__(self, app: ASGIApp, window: float):
+        self.app = app
+        self.window = window
+        self._cookie_attributes = (
+            f"Max-Age={math.ceil(window)}; Path=/; HttpOnly; SameSite=Lax"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        value = HTTPConnection(scope).cookies.get(self.cookie_name)
+        if value is not None:
+            try:
+                scope.setdefault("state", {})["last_write_at"] = float(value)
+            except ValueError:
+                pass
+
+        if scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{self.cookie_name}={time.time():.3f}; {self._cookie_attributes}",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
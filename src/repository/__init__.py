@@ -1,4 +1,5 @@
 from .contact_repository import ContactRepository
 from .user_repository import UserRepository
+from .warmup import prime_hot_queries
 
-__all__ = ["ContactRepository", "UserRepository"]
+__all__ = ["ContactRepository", "UserRepository", "prime_hot_queries"]
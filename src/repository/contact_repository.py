@@ -1,16 +1,119 @@
 from __future__ import annotations
 
+import calendar
 import datetime
-from typing import Sequence
+from collections import defaultdict
+from typing import AsyncIterator, Sequence
 
 
-from sqlalchemy import select, extract, and_, tuple_
+from sqlalchemy import (
+    Integer,
+    Select,
+    cast,
+    column,
+    literal,
+    values,
+    select,
+    update,
+    delete,
+    and_,
+    or_,
+    tuple_,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import Contact, User
+from src.database.models import Contact, ContactCount, ContactTombstone, User
 from src.schemas import ContactUpdate
 
-__all__ = ["ContactRepository"]
+__all__ = ["ContactRepository", "CONTACT_SORT_KEY", "CONTACT_COLUMNS"]
+
+# Stable listing order, served by ix_contacts_user_id_last_name_first_name_id.
+CONTACT_SORT_KEY = (Contact.last_name, Contact.first_name, Contact.id)
+
+# Columns selected by the list queries, which return plain rows rather than
+# ORM objects.
+CONTACT_COLUMNS = (
+    Contact.id,
+    Contact.first_name,
+    Contact.last_name,
+    Contact.email,
+    Contact.phone_number,
+    Contact.birthday,
+    Contact.created_at,
+    Contact.updated_at,
+)
+
+
+EXPORT_FETCH_SIZE = 1_000
+
+IMPORT_STAGING_TABLE = "contacts_import_staging"
+IMPORT_STAGING_COLUMNS = [
+    "line_no",
+    "first_name",
+    "last_name",
+    "email",
+    "phone_number",
+    "birthday",
+]
+CREATE_IMPORT_STAGING = f"""
+CREATE TEMP TABLE {IMPORT_STAGING_TABLE} (
+    line_no integer NOT NULL,
+    first_name varchar(50) NOT NULL,
+    last_name varchar(50) NOT NULL,
+    email varchar(60) NOT NULL,
+    phone_number varchar(20),
+    birthday date
+) ON COMMIT DROP
+"""
+MERGE_IMPORT_STAGING = f"""
+WITH incoming AS (
+    SELECT DISTINCT ON (email)
+        first_name, last_name, email, phone_number, birthday
+    FROM {IMPORT_STAGING_TABLE}
+    ORDER BY email, line_no DESC
+),
+merged AS (
+    INSERT INTO contacts (
+        user_id, first_name, last_name, email, phone_number, birthday,
+        created_at, updated_at
+    )
+    SELECT
+        :user_id, first_name, last_name, email, phone_number, birthday,
+        now(), now()
+    FROM incoming
+    ON CONFLICT ON CONSTRAINT unique_contact_user_email DO UPDATE SET
+        first_name = EXCLUDED.first_name,
+        last_name = EXCLUDED.last_name,
+        phone_number = EXCLUDED.phone_number,
+        birthday = EXCLUDED.birthday,
+        updated_at = now()
+    WHERE (
+        contacts.first_name,
+        contacts.last_name,
+        contacts.phone_number,
+        contacts.birthday
+    ) IS DISTINCT FROM (
+        EXCLUDED.first_name,
+        EXCLUDED.last_name,
+        EXCLUDED.phone_number,
+        EXCLUDED.birthday
+    )
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT
+    count(*) FILTER (WHERE inserted) AS inserted,
+    count(*) FILTER (WHERE NOT inserted) AS updated,
+    (SELECT count(*) FROM incoming) - count(*) AS unchanged
+FROM merged
+"""
+
+
+def _mmdd(day: datetime.date) -> int:
+    return day.month * 100 + day.day
 
 
 class ContactRepository:
@@ -24,18 +127,26 @@ class ContactRepository:
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def get_contacts(
+    def _filter_contacts(
         self,
-        skip: int,
-        limit: int,
+        stmt: Select,
         first_name: str | None,
         last_name: str | None,
         email: str | None,
         user: User,
-    ) -> Sequence[Contact]:
-
-        stmt = select(Contact).where(Contact.user_id == user.id)
+        q: str | None = None,
+    ) -> Select:
+        stmt = stmt.where(Contact.user_id == user.id)
         filters = []
+        if q:
+            pattern = f"%{q}%"
+            filters.append(
+                or_(
+                    Contact.first_name.ilike(pattern),
+                    Contact.last_name.ilike(pattern),
+                    Contact.email.ilike(pattern),
+                )
+            )
         if first_name:
             filters.append(Contact.first_name.ilike(f"%{first_name}%"))
         if last_name:
@@ -45,55 +156,402 @@ class ContactRepository:
 
         if filters:
             stmt = stmt.where(and_(*filters))
+        return stmt
 
-        stmt = stmt.offset(skip).limit(limit)
+    async def get_contacts_by_ids(self, ids: list[int], user: User) -> Sequence[Row]:
+        stmt = (
+            select(*CONTACT_COLUMNS)
+            .where(Contact.user_id == user.id, Contact.id.in_(ids))
+            .order_by(Contact.id)
+        )
         result = await self.db.execute(stmt)
+        return result.all()
 
-        return result.scalars().all()
+    async def get_contacts_version(self, user: User) -> int:
+        """
+        Reads the trigger-maintained change counter of the user's contacts,
+        which grows with every statement that writes any of them.
+        """
+        stmt = select(ContactCount.change_count).where(
+            ContactCount.user_id == user.id
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none() or 0
 
-    async def get_upcoming_birthdays(self, user: User) -> Sequence[Contact]:
-        today = datetime.date.today()
+    async def get_contact_updated_at(
+        self, contact_id: int, user: User
+    ) -> datetime.datetime | None:
+        stmt = select(Contact.updated_at).where(
+            Contact.id == contact_id, Contact.user_id == user.id
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
 
-        target_dates = [today + datetime.timedelta(days=i) for i in range(7)]
-        birthday_tuples = [(d.month, d.day) for d in target_dates]
+    async def get_contacts(
+        self,
+        skip: int,
+        limit: int,
+        first_name: str | None,
+        last_name: str | None,
+        email: str | None,
+        user: User,
+        after: tuple[str, str, int] | None = None,
+        q: str | None = None,
+        with_total: bool = False,
+    ) -> Sequence[Row]:
+        """
+        Returns a page of the user's contacts ordered by (last_name, first_name, id),
+        as rows of CONTACT_COLUMNS.
+        When `after` holds the sort key of the previous page's last row, the page
+        is fetched by keyset and `skip` is ignored.
 
-        stmt = select(Contact).where(
-            and_(
-                Contact.user_id == user.id,
-                tuple_(
-                    extract("month", Contact.birthday), extract("day", Contact.birthday)
-                ).in_(birthday_tuples),
+        With a search term `q`, contacts matching it in any of first name, last
+        name or email are returned best match first; the substring predicates
+        are served by the (user_id, column gin_trgm_ops) GIN indexes.
+
+        With `with_total`, every row also carries `total_count`, the number of
+        rows matching the filters (and cursor), computed by a window function
+        in the same query.
+        """
+        columns = list(CONTACT_COLUMNS)
+        if with_total:
+            columns.append(func.count().over().label("total_count"))
+        stmt = self._filter_contacts(
+            select(*columns), first_name, last_name, email, user, q
+        )
+        if q:
+            rank = func.greatest(
+                func.similarity(Contact.first_name, q),
+                func.similarity(Contact.last_name, q),
+                func.similarity(func.coalesce(Contact.email, ""), q),
             )
+            stmt = stmt.order_by(rank.desc(), Contact.id).offset(skip).limit(limit)
+            result = await self.db.execute(stmt)
+            return result.all()
+
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(Contact.last_name, Contact.first_name, Contact.id)
+                > tuple_(*after)
+            )
+        else:
+            stmt = stmt.offset(skip)
+
+        stmt = stmt.order_by(*CONTACT_SORT_KEY).limit(limit)
+        result = await self.db.execute(stmt)
+
+        return result.all()
+
+    async def count_contacts(
+        self,
+        first_name: str | None,
+        last_name: str | None,
+        email: str | None,
+        user: User,
+        q: str | None = None,
+    ) -> int:
+        stmt = self._filter_contacts(
+            select(func.count()).select_from(Contact),
+            first_name,
+            last_name,
+            email,
+            user,
+            q,
         )
         result = await self.db.execute(stmt)
-        return result.scalars().all()
+        return result.scalar_one()
+
+    async def get_contact_count(self, user: User) -> int:
+        """Reads the trigger-maintained number of the user's contacts."""
+        stmt = select(ContactCount.contact_count).where(
+            ContactCount.user_id == user.id
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none() or 0
+
+    async def stream_contacts(
+        self,
+        first_name: str | None,
+        last_name: str | None,
+        email: str | None,
+        user: User,
+        q: str | None = None,
+    ) -> AsyncIterator[Contact]:
+        """
+        Yields every matching contact in listing order through a server-side
+        cursor, fetching EXPORT_FETCH_SIZE rows at a time.
+        """
+        stmt = self._filter_contacts(
+            select(Contact), first_name, last_name, email, user, q
+        ).order_by(*CONTACT_SORT_KEY)
+        result = await self.db.stream_scalars(
+            stmt, execution_options={"yield_per": EXPORT_FETCH_SIZE}
+        )
+        async for contact in result:
+            yield contact
+
+    async def get_upcoming_birthdays(
+        self, user: User, days: int = 7
+    ) -> Sequence[Row]:
+        """
+        Returns contacts whose birthday falls within `days` days starting today,
+        soonest first, as rows of CONTACT_COLUMNS. The window is matched against
+        the indexed `birthday_mmdd` expression as one or two ranges, wrapping past
+        Dec 31.
+        """
+        today = datetime.date.today()
+        stmt = select(*CONTACT_COLUMNS).where(
+            Contact.user_id == user.id, Contact.birthday_mmdd.is_not(None)
+        )
 
-    async def create_contact(self, contact_data: dict, user: User) -> Contact:
-        contact = Contact(**contact_data, user_id=user.id)
-        self.db.add(contact)
+        end = today + datetime.timedelta(days=days - 1)
+        start_mmdd = _mmdd(today)
+        end_mmdd = _mmdd(end)
+        # Feb 29 birthdays are celebrated on Mar 1 in non-leap years.
+        if start_mmdd == 301 and not calendar.isleap(today.year):
+            start_mmdd = 229
+
+        if end.year == today.year:
+            stmt = stmt.where(Contact.birthday_mmdd.between(start_mmdd, end_mmdd))
+        elif end_mmdd < start_mmdd:
+            stmt = stmt.where(
+                or_(
+                    Contact.birthday_mmdd >= start_mmdd,
+                    Contact.birthday_mmdd <= end_mmdd,
+                )
+            )
+        # Otherwise the window spans a whole year and every birthday matches.
+
+        # Birthdays later this year come before those early next year.
+        stmt = stmt.order_by(Contact.birthday_mmdd < start_mmdd, Contact.birthday_mmdd)
+
+        result = await self.db.execute(stmt)
+        return result.all()
+
+    async def create_contact(self, contact_data: dict, user: User) -> Contact | None:
+        """
+        Inserts a contact in a single INSERT ... RETURNING statement.
+        Returns None if the user already has a contact with this email.
+        """
+        stmt = (
+            insert(Contact)
+            .values(**contact_data, user_id=user.id)
+            .on_conflict_do_nothing(constraint="unique_contact_user_email")
+            .returning(Contact)
+        )
+        result = await self.db.execute(stmt)
+        contact = result.scalar_one_or_none()
         await self.db.commit()
-        await self.db.refresh(contact)
         return contact
 
-    async def update_contact(
-        self, contact_id: int, body: ContactUpdate, user: User
-    ) -> Contact | None:
+    async def bulk_upsert_contacts(
+        self, rows: list[tuple], user: User
+    ) -> tuple[int, int, int]:
+        """
+        Loads `rows` of (line_no, first_name, last_name, email, phone_number,
+        birthday) into a transaction-scoped staging table with COPY and merges
+        them into contacts on unique_contact_user_email, last row winning.
+        Existing contacts are only rewritten, and their updated_at bumped, when
+        a field actually changes.
+        Commits and returns the number of inserted, updated and unchanged
+        contacts.
+        """
+        await self.db.execute(text(CREATE_IMPORT_STAGING))
 
-        contact = await self.get_contact_by_id(contact_id, user)
-        if contact:
-            update_data = body.model_dump(exclude_unset=True)
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            IMPORT_STAGING_TABLE, records=rows, columns=IMPORT_STAGING_COLUMNS
+        )
 
-            for key, value in update_data.items():
-                setattr(contact, key, value)
+        result = await self.db.execute(
+            text(MERGE_IMPORT_STAGING), {"user_id": user.id}
+        )
+        inserted, updated, unchanged = result.one()
+        await self.db.commit()
+        return inserted, updated, unchanged
 
-            await self.db.commit()
-            await self.db.refresh(contact)
+    async def update_contact(
+        self, contact_id: int, body: ContactUpdate, user: User
+    ) -> Contact | None:
+        update_data = body.model_dump(exclude_unset=True)
+        if not update_data:
+            return await self.get_contact_by_id(contact_id, user)
 
+        stmt = (
+            update(Contact)
+            .where(Contact.id == contact_id, Contact.user_id == user.id)
+            .values(**update_data)
+            .returning(Contact)
+        )
+        result = await self.db.execute(stmt)
+        contact = result.scalar_one_or_none()
+        await self.db.commit()
         return contact
 
     async def delete_contact(self, contact_id: int, user: User) -> Contact | None:
-        contact = await self.get_contact_by_id(contact_id, user)
+        """Deletes the contact and records a tombstone for delta sync."""
+        stmt = (
+            delete(Contact)
+            .where(Contact.id == contact_id, Contact.user_id == user.id)
+            .returning(Contact)
+        )
+        result = await self.db.execute(stmt)
+        contact = result.scalar_one_or_none()
         if contact:
-            await self.db.delete(contact)
-            await self.db.commit()
+            self.db.add(ContactTombstone(user_id=user.id, contact_id=contact.id))
+        await self.db.commit()
         return contact
+
+    async def batch_mutate_contacts(
+        self, updates: list[dict], delete_ids: list[int], user: User
+    ) -> tuple[set[int], set[int]]:
+        """
+        Applies partial updates (dicts holding "id" plus the fields to set) and
+        deletions in one transaction. Updates touching the same set of fields
+        share one UPDATE ... FROM (VALUES ...) statement. Returns the ids that
+        were updated and deleted; ids not owned by the user are left out.
+        """
+        groups: dict[tuple[str, ...], list[dict]] = defaultdict(list)
+        for item in updates:
+            fields = tuple(sorted(key for key in item if key != "id"))
+            if fields:
+                groups[fields].append(item)
+
+        updated: set[int] = set()
+        for fields, items in groups.items():
+            types = [Contact.__table__.c[field].type for field in fields]
+            columns = [column(field, type_) for field, type_ in zip(fields, types)]
+            # Every value is cast to its column type. Untyped, a NULL leaves
+            # Postgres to guess the VALUES column type, and a group of only
+            # NULLs comes out as text.
+            rows = values(column("id", Integer), *columns, name="batch").data(
+                [
+                    (
+                        item["id"],
+                        *(
+                            cast(literal(item[field], type_), type_)
+                            for field, type_ in zip(fields, types)
+                        ),
+                    )
+                    for item in items
+                ]
+            )
+            stmt = (
+                update(Contact)
+                .where(Contact.id == rows.c.id, Contact.user_id == user.id)
+                .values({field: rows.c[field] for field in fields})
+                .returning(Contact.id)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.db.execute(stmt)
+            updated.update(result.scalars().all())
+
+        # Updates with no fields still report whether the contact exists.
+        empty_ids = [item["id"] for item in updates if len(item) == 1]
+        if empty_ids:
+            result = await self.db.execute(
+                select(Contact.id).where(
+                    Contact.user_id == user.id, Contact.id.in_(empty_ids)
+                )
+            )
+            updated.update(result.scalars().all())
+
+        deleted: set[int] = set()
+        if delete_ids:
+            result = await self.db.execute(
+                delete(Contact)
+                .where(Contact.user_id == user.id, Contact.id.in_(delete_ids))
+                .returning(Contact.id)
+                .execution_options(synchronize_session=False)
+            )
+            deleted.update(result.scalars().all())
+        if deleted:
+            await self.db.execute(
+                insert(ContactTombstone),
+                [
+                    {"user_id": user.id, "contact_id": contact_id}
+                    for contact_id in deleted
+                ],
+            )
+
+        await self.db.commit()
+        return updated, deleted
+
+    async def get_sync_horizon(self, lag_seconds: float) -> datetime.datetime:
+        """
+        Returns the database clock minus `lag_seconds`. Rows stamped at or
+        before it are assumed to belong to committed transactions.
+        """
+        stmt = select(func.now() - datetime.timedelta(seconds=lag_seconds))
+        result = await self.db.execute(stmt)
+        return result.scalar_one()
+
+    async def get_changed_contacts(
+        self,
+        after: tuple[datetime.datetime, int],
+        until: datetime.datetime,
+        limit: int,
+        user: User,
+    ) -> Sequence[Contact]:
+        """
+        Contacts created or updated after the (updated_at, id) position `after`,
+        read in order from ix_contacts_user_id_updated_at_id.
+        """
+        stmt = (
+            select(Contact)
+            .where(
+                Contact.user_id == user.id,
+                tuple_(Contact.updated_at, Contact.id) > tuple_(*after),
+                Contact.updated_at <= until,
+            )
+            .order_by(Contact.updated_at, Contact.id)
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def get_contact_tombstones(
+        self,
+        after: tuple[datetime.datetime, int],
+        until: datetime.datetime,
+        limit: int,
+        user: User,
+    ) -> Sequence[ContactTombstone]:
+        """Tombstones recorded after the (deleted_at, id) position `after`."""
+        stmt = (
+            select(ContactTombstone)
+            .where(
+                ContactTombstone.user_id == user.id,
+                tuple_(ContactTombstone.deleted_at, ContactTombstone.id)
+                > tuple_(*after),
+                ContactTombstone.deleted_at <= until,
+            )
+            .order_by(ContactTombstone.deleted_at, ContactTombstone.id)
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def delete_expired_tombstones(
+        self, retention: datetime.timedelta, limit: int
+    ) -> int:
+        """
+        Deletes up to `limit` tombstones recorded more than `retention` ago,
+        oldest first, and returns how many went. Rows another worker is
+        already deleting are skipped rather than waited for.
+        """
+        expired = (
+            select(ContactTombstone.id)
+            .where(ContactTombstone.deleted_at < func.now() - retention)
+            .order_by(ContactTombstone.deleted_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.execute(
+            delete(ContactTombstone)
+            .where(ContactTombstone.id.in_(expired.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount
@@ -2,6 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 
+from src.cache import invalidate_user
 from src.database.models import User
 from src.schemas import UserCreate
 
@@ -53,11 +54,13 @@ class UserRepository:
         if user:
             user.verified = True
             await self.db.commit()
+            invalidate_user(email)
 
     async def update_avatar_url(self, email: str, url: str) -> User | None:
         user = await self.get_user_by_email(email)
         if user:
             user.avatar_url = url
             await self.db.commit()
+            invalidate_user(email)
             await self.db.refresh(user)
             return user
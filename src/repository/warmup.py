@@ -0,0 +1,28 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import User
+from src.repository.contact_repository import ContactRepository
+from src.repository.user_repository import UserRepository
+
+__all__ = ["prime_hot_queries"]
+
+
+async def prime_hot_queries(session: AsyncSession) -> None:
+    """
+    Runs the hot read queries once with parameters that match no rows, which
+    prepares them on the session's connection and fills the compiled cache.
+    """
+    probe_user = User(id=0, email="")
+    user_repo = UserRepository(session)
+    contact_repo = ContactRepository(session)
+
+    await user_repo.get_user_by_email("")
+    await user_repo.get_user_by_username("")
+    await contact_repo.get_contact_by_id(0, probe_user)
+    await contact_repo.get_contacts(0, 10, None, None, None, probe_user)
+    await contact_repo.get_contacts(
+        0, 10, None, None, None, probe_user, after=("", "", 0)
+    )
+    await contact_repo.get_upcoming_birthdays(probe_user)
+    await contact_repo.get_contacts_version(probe_user)
+    await contact_repo.get_contact_count(probe_user)
@@ -1,4 +1,15 @@
-from .contact_schema import ContactBase, ContactResponse, ContactUpdate
+from .contact_schema import (
+    ContactBase,
+    ContactResponse,
+    ContactUpdate,
+    ContactChanges,
+    ContactBatchUpdate,
+    ContactBatchRequest,
+    ContactBatchItemResult,
+    ContactBatchResponse,
+    ContactImportError,
+    ContactImportReport,
+)
 from .user_schema import UserBase, UserCreate, UserResponse, RequestEmail
 from .token_schema import TokenResponse
 
@@ -6,6 +17,13 @@ __all__ = [
     "ContactBase",
     "ContactResponse",
     "ContactUpdate",
+    "ContactChanges",
+    "ContactBatchUpdate",
+    "ContactBatchRequest",
+    "ContactBatchItemResult",
+    "ContactBatchResponse",
+    "ContactImportError",
+    "ContactImportReport",
     "UserBase",
     "UserCreate",
     "UserResponse",
@@ -1,5 +1,13 @@
 from datetime import date, datetime
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
+from typing import Literal
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, field_validator
+
+
+def _reject_nul(value: str | None) -> str | None:
+    # PostgreSQL text cannot store NUL, so it would fail the whole statement.
+    if value is not None and "\x00" in value:
+        raise ValueError("Must not contain NUL characters")
+    return value
 
 
 class ContactBase(BaseModel):
@@ -9,6 +17,11 @@ class ContactBase(BaseModel):
     phone_number: str | None = Field(default=None, max_length=20)
     birthday: date | None = None
 
+    @field_validator("first_name", "last_name", "phone_number")
+    @classmethod
+    def _check_nul(cls, value: str | None) -> str | None:
+        return _reject_nul(value)
+
 
 class ContactUpdate(BaseModel):
     first_name: str | None = Field(default=None, max_length=50)
@@ -17,6 +30,11 @@ class ContactUpdate(BaseModel):
     phone_number: str | None = Field(default=None, max_length=20)
     birthday: date | None = None
 
+    @field_validator("first_name", "last_name", "phone_number")
+    @classmethod
+    def _check_nul(cls, value: str | None) -> str | None:
+        return _reject_nul(value)
+
 
 class ContactResponse(ContactBase):
     id: int
@@ -24,3 +42,55 @@ class ContactResponse(ContactBase):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ContactBatchUpdate(ContactUpdate):
+    id: int
+
+    @field_validator("first_name", "last_name")
+    @classmethod
+    def _reject_null(cls, value: str | None) -> str:
+        # Omitting a field leaves it unchanged; null would violate NOT NULL.
+        if value is None:
+            raise ValueError("Field may be omitted but not set to null")
+        return value
+
+
+class ContactBatchRequest(BaseModel):
+    update: list[ContactBatchUpdate] = Field(default_factory=list, max_length=500)
+    delete: list[int] = Field(default_factory=list, max_length=500)
+
+
+class ContactBatchItemResult(BaseModel):
+    id: int
+    action: Literal["update", "delete"]
+    status: Literal["updated", "deleted", "not_found"]
+
+
+class ContactBatchResponse(BaseModel):
+    results: list[ContactBatchItemResult]
+
+
+class ContactChanges(BaseModel):
+    changed: list[ContactResponse]
+    deleted: list[int]
+    next_since: str
+    has_more: bool
+
+
+class ContactImportError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class ContactImportReport(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+    unchanged: int
+    duplicates: int
+    failed: int
+    errors: list[ContactImportError]
+    errors_truncated: bool
+    elapsed_seconds: float
+    rows_per_second: float | None
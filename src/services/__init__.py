@@ -4,9 +4,14 @@ from .auth_service import AuthService, get_current_user
 from .email_service import EmailService
 from .limiter import limiter
 from .upload_file import upload_file
+from .password_hasher import password_hasher
+from .mail_worker import mail_worker
+from .tombstone_pruner import tombstone_pruner
 
 from .dependencies import (
+    get_read_db,
     get_contact_service,
+    get_read_contact_service,
     get_user_service,
     get_auth_service,
 )
@@ -15,6 +20,8 @@ from .dependencies import (
 __all__ = [
     "ContactService",
     "get_contact_service",
+    "get_read_contact_service",
+    "get_read_db",
     "AuthService",
     "UserService",
     "EmailService",
@@ -23,4 +30,7 @@ __all__ = [
     "get_current_user",
     "limiter",
     "upload_file",
+    "password_hasher",
+    "mail_worker",
+    "tombstone_pruner",
 ]
@@ -6,28 +6,28 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.cache import get_cached_user, cache_user
 from src.conf.config import settings
 from src.database.db import get_db
 from src.repository import UserRepository
+from src.services.password_hasher import password_hasher
 
 __all__ = ["AuthService", "get_current_user"]
 
 
 class AuthService:
-    # Password Hashing Setup
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
     # OAuth2 Scheme Setup
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(
+        self, plain_password: str, hashed_password: str
+    ) -> bool:
+        return await password_hasher.verify(plain_password, hashed_password)
 
-    def hash_password(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+    async def hash_password(self, password: str) -> str:
+        return await password_hasher.hash(password)
 
     async def create_access_token(
         self, data: dict, expires_delta: Optional[timedelta] = None
@@ -143,7 +143,7 @@ class AuthService:
         else:
             user = await user_repo.get_user_by_username(body.username)
 
-        if user is None or not self.verify_password(
+        if user is None or not await self.verify_password(
             body.password, user.hashed_password
         ):
             raise HTTPException(
@@ -192,11 +192,14 @@ async def get_current_user(
     except JWTError as e:
         raise credentials_exception from e
 
-    user_repo = UserRepository(db)
-    user = await user_repo.get_user_by_email(email)
-
+    user = get_cached_user(email)
     if user is None:
-        raise credentials_exception
+        user_repo = UserRepository(db)
+        user = await user_repo.get_user_by_email(email)
+
+        if user is None:
+            raise credentials_exception
+        cache_user(user)
 
     request.state.user = user
     return user
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator
+
+from fastapi import HTTPException, status
+
+__all__ = ["iter_import_records"]
+
+CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+NDJSON_CONTENT_TYPES = {
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+    "application/x-jsonlines",
+}
+
+
+# Longest line or CSV record accepted; contact fields are short, so anything
+# longer is a malformed upload and is reported instead of buffered.
+MAX_RECORD_LENGTH = 16 * 1024
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Decodes a byte stream incrementally and yields complete lines. A line
+    longer than MAX_RECORD_LENGTH is yielded cut to MAX_RECORD_LENGTH + 1
+    characters, and the rest of it is discarded as it arrives.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    truncated = False
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if truncated:
+                # The tail of a line that was already yielded cut short.
+                truncated = False
+                continue
+            yield line.rstrip("\r")
+        if truncated:
+            pending = ""
+        elif len(pending) > MAX_RECORD_LENGTH:
+            yield pending[: MAX_RECORD_LENGTH + 1]
+            pending = ""
+            truncated = True
+    pending += decoder.decode(b"", final=True)
+    if pending and not truncated:
+        yield pending.rstrip("\r")
+
+
+def _ends_in_quoted_field(line: str, in_quotes: bool) -> bool:
+    """
+    Returns whether a CSV record is inside a quoted field at the end of
+    `line`, given whether it was at its start. As in the csv module, a quote
+    opens a quoted field only at the start of a field; elsewhere, as in
+    O"Neil, it is an ordinary character.
+    """
+    position = 0
+    while (quote := line.find('"', position)) != -1:
+        position = quote + 1
+        if in_quotes:
+            if line.startswith('"', position):
+                # An escaped quote.
+                position += 1
+            else:
+                in_quotes = False
+        elif quote == 0 or line[quote - 1] == ",":
+            in_quotes = True
+    return in_quotes
+
+
+async def _iter_csv(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    header: list[str] | None = None
+    record: list[str] = []
+    record_length = 0
+    in_quotes = False
+    row_number = 0
+    async for line in _iter_lines(chunks):
+        record.append(line)
+        record_length += len(line) + 1
+        if record_length > MAX_RECORD_LENGTH + 1:
+            row_number += 1
+            yield row_number, f"Record exceeds {MAX_RECORD_LENGTH} characters"
+            record, record_length, in_quotes = [], 0, False
+            continue
+
+        # A quoted field may contain newlines; keep reading until it closes.
+        in_quotes = _ends_in_quoted_field(line, in_quotes)
+        if in_quotes:
+            continue
+        current = "\n".join(record)
+        record, record_length = [], 0
+        if not current.strip():
+            continue
+
+        try:
+            values = next(csv.reader([current]))
+        except csv.Error as e:
+            if header is None:
+                # Without a header no row can be read; report it as row 0.
+                yield 0, f"Invalid CSV header: {e}"
+                return
+            row_number += 1
+            yield row_number, f"Invalid CSV: {e}"
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row_number, {
+            name: (value if value != "" else None)
+            for name, value in zip(header, values)
+        }
+
+    if record:
+        yield row_number + 1, "Unterminated quoted field"
+
+
+async def _iter_ndjson(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    row_number = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        if len(line) > MAX_RECORD_LENGTH:
+            yield row_number, f"Record exceeds {MAX_RECORD_LENGTH} characters"
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, "Expected a JSON object"
+            continue
+        yield row_number, record
+
+
+def iter_import_records(
+    chunks: AsyncIterator[bytes], content_type: str
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    """
+    Parses a CSV (with a header row) or NDJSON request body as it streams in.
+    Yields `(row_number, record)` pairs, where `record` is a field dict or an
+    error message for rows that could not be parsed. A CSV header that cannot
+    be parsed is reported as row 0, and nothing after it is read.
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in CSV_CONTENT_TYPES:
+        return _iter_csv(chunks)
+    if media_type in NDJSON_CONTENT_TYPES:
+        return _iter_ndjson(chunks)
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Import body must be text/csv or application/x-ndjson",
+    )
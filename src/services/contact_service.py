@@ -1,23 +1,67 @@
 from __future__ import annotations
-from typing import Sequence
+import csv
+import io
+import json
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterator, Sequence
 
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from asyncpg.exceptions import UniqueViolationError
 
 
+from src.cache import response_cache, single_flight
+from src.conf.config import settings
+from src.database.db import session_manager
 from src.repository import ContactRepository
-from src.schemas import ContactBase, ContactUpdate
+from src.services.contact_import import iter_import_records
+from src.services.etag import make_etag
+from src.services.pagination import encode_cursor, decode_cursor
+from src.schemas import ContactBase, ContactUpdate, ContactBatchRequest
 from src.database.models import Contact, User
 
 __all__ = ["ContactService"]
 
+IMPORT_EMAIL_MAX_LENGTH = Contact.__table__.c.email.type.length
+
+SYNC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+SYNC_MAX_ID = 2**31 - 1
+
+EXPORT_CHUNK_ROWS = 500
+EXPORT_FIELDS = (
+    "id",
+    "first_name",
+    "last_name",
+    "email",
+    "phone_number",
+    "birthday",
+    "created_at",
+    "updated_at",
+)
+
+
+def _export_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
 
 class ContactService:
     def __init__(self, db: AsyncSession):
         self._contact_repository = ContactRepository(session=db)
 
+    async def _record_write(self, user: User) -> None:
+        """
+        Pins the user's reads to the primary and drops their cached and
+        in-flight responses.
+        """
+        session_manager.mark_write(user.id)
+        single_flight.invalidate(user.id)
+        await response_cache.invalidate_user(user.id)
+
     async def get_contacts(
         self,
         skip: int,
@@ -26,18 +70,160 @@ class ContactService:
         last_name: str | None,
         email: str | None,
         user: User,
-    ) -> Sequence[Contact]:
+        cursor: str | None = None,
+        q: str | None = None,
+        include_total: bool = False,
+    ) -> tuple[Sequence[Row], str | None, int | None]:
+        """
+        Returns a page of contacts, the cursor for the next page if the page is
+        full, and the total number of matching contacts if requested. A cursor
+        takes precedence over `skip`. Ranked search results (`q`) are paged
+        with `skip` only.
+
+        Unfiltered totals come from the per-user contact counter; filtered
+        totals from a window count in the page query itself.
+        """
+        after = None
+        if cursor and not q:
+            after_last, after_first, after_id = decode_cursor(cursor, 3)
+            if not (
+                isinstance(after_last, str)
+                and isinstance(after_first, str)
+                and isinstance(after_id, int)
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+                )
+            after = (after_last, after_first, after_id)
+
+        filtered = bool(first_name or last_name or email or q)
+        # Past a cursor the window would only count the remaining rows.
+        window_total = include_total and filtered and after is None
         contacts = await self._contact_repository.get_contacts(
-            skip, limit, first_name, last_name, email, user
+            skip, limit, first_name, last_name, email, user, after, q, window_total
         )
-        return contacts
+
+        total = None
+        if include_total:
+            if not filtered:
+                total = await self._contact_repository.get_contact_count(user)
+            elif window_total and contacts:
+                total = contacts[0].total_count
+            elif window_total and skip == 0:
+                total = 0
+            else:
+                total = await self._contact_repository.count_contacts(
+                    first_name, last_name, email, user, q
+                )
+
+        next_cursor = None
+        if len(contacts) == limit and not q:
+            last = contacts[-1]
+            next_cursor = encode_cursor([last.last_name, last.first_name, last.id])
+        return contacts, next_cursor, total
+
+    async def get_contacts_etag(self, user: User, route: str, params: list) -> str:
+        """
+        Weak ETag for a listing of the user's contacts, built from their change
+        counter. Every insert, update or delete bumps it in the same
+        transaction, so the tag changes whenever a listing could have, even
+        when the latest updated_at and the row count stay the same.
+        """
+        version = await self._contact_repository.get_contacts_version(user)
+        return make_etag(user.id, route, sorted(params), version)
+
+    async def get_contact_etag(self, contact_id: int, user: User) -> str | None:
+        updated_at = await self._contact_repository.get_contact_updated_at(
+            contact_id, user
+        )
+        if updated_at is None:
+            return None
+        return make_etag(user.id, contact_id, updated_at)
+
+    async def get_changes(self, since: str | None, limit: int, user: User) -> dict:
+        """
+        Returns up to `limit` contacts changed and up to `limit` contacts deleted
+        since the sync token `since`, plus the token for the next call. Without
+        `since` every contact is returned and no deletions, since the client has
+        nothing to delete yet. Only rows older than SYNC_WATERMARK_LAG_SECONDS
+        are returned, so transactions still in flight are picked up next time.
+
+        Tombstones are kept for SYNC_TOMBSTONE_RETENTION_DAYS; a token older
+        than that could miss pruned deletions, so it is rejected with 410 and
+        the client has to start over with a full sync.
+        """
+        horizon = await self._contact_repository.get_sync_horizon(
+            settings.SYNC_WATERMARK_LAG_SECONDS
+        )
+        contacts_after = (SYNC_EPOCH, 0)
+        tombstones_after = (horizon, SYNC_MAX_ID)
+        if since:
+            key = decode_cursor(since, 4)
+            try:
+                contacts_after = (datetime.fromisoformat(key[0]), int(key[1]))
+                tombstones_after = (datetime.fromisoformat(key[2]), int(key[3]))
+                if (
+                    contacts_after[0].tzinfo is None
+                    or tombstones_after[0].tzinfo is None
+                ):
+                    raise ValueError("Sync token timestamps must be timezone-aware")
+            except (TypeError, ValueError) as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid sync token",
+                ) from e
+            retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+            if tombstones_after[0] < horizon - retention:
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail="Sync token expired; start a full sync without since",
+                )
+
+        changed = await self._contact_repository.get_changed_contacts(
+            contacts_after, horizon, limit + 1, user
+        )
+        tombstones = []
+        if since:
+            tombstones = await self._contact_repository.get_contact_tombstones(
+                tombstones_after, horizon, limit + 1, user
+            )
+
+        # A full page resumes after its last row; otherwise everything up to
+        # the horizon has been seen.
+        has_more = len(changed) > limit or len(tombstones) > limit
+        changed, tombstones = changed[:limit], tombstones[:limit]
+        if len(changed) == limit:
+            contacts_after = (changed[-1].updated_at, changed[-1].id)
+        else:
+            contacts_after = (horizon, SYNC_MAX_ID)
+        if len(tombstones) == limit:
+            tombstones_after = (tombstones[-1].deleted_at, tombstones[-1].id)
+        else:
+            tombstones_after = (horizon, SYNC_MAX_ID)
+
+        next_since = encode_cursor(
+            [
+                contacts_after[0].isoformat(),
+                contacts_after[1],
+                tombstones_after[0].isoformat(),
+                tombstones_after[1],
+            ]
+        )
+        return {
+            "changed": changed,
+            "deleted": [tombstone.contact_id for tombstone in tombstones],
+            "next_since": next_since,
+            "has_more": has_more,
+        }
 
     async def get_contact_by_id(self, contact_id: int, user: User) -> Contact | None:
         contact = await self._contact_repository.get_contact_by_id(contact_id, user)
         return contact
 
-    async def get_upcoming_birthdays(self, user: User) -> Sequence[Contact]:
-        contacts = await self._contact_repository.get_upcoming_birthdays(user)
+    async def get_upcoming_birthdays(
+        self, user: User, days: int = 7
+    ) -> Sequence[Row]:
+        contacts = await self._contact_repository.get_upcoming_birthdays(user, days)
         return contacts
 
     async def create_contact(self, body: ContactBase, user: User) -> Contact:
@@ -46,32 +232,221 @@ class ContactService:
             new_contact = await self._contact_repository.create_contact(
                 contact_data, user
             )
-            return new_contact
-
-        # Unique constraint violation
+        # Other unexpected database errors
         except IntegrityError as e:
-            if isinstance(e.orig, UniqueViolationError):
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail=f"Contact with email '{body.email}' already exists for this user.",
-                ) from e
-
-            # Other unexpected database errors
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="An unexpected database error occurred.",
             ) from e
 
+        # Unique constraint conflict, skipped by ON CONFLICT DO NOTHING
+        if new_contact is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Contact with email '{body.email}' already exists for this user.",
+            )
+        await self._record_write(user)
+        return new_contact
+
+    async def import_contacts(
+        self, chunks: AsyncIterator[bytes], content_type: str, user: User
+    ) -> dict:
+        """
+        Streams a CSV or NDJSON body into the user's contacts. Rows are
+        validated against ContactBase and merged in batches of
+        BULK_IMPORT_BATCH_SIZE; each batch is committed on its own, so rows
+        from earlier batches are kept if a later one fails.
+        """
+        started = time.perf_counter()
+        report = {
+            "received": 0,
+            "inserted": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "duplicates": 0,
+            "failed": 0,
+            "errors": [],
+            "errors_truncated": False,
+        }
+        batch: list[tuple] = []
+
+        def add_error(row: int, messages: list[str]) -> None:
+            report["failed"] += 1
+            if len(report["errors"]) < settings.BULK_IMPORT_MAX_ERRORS:
+                report["errors"].append({"row": row, "errors": messages})
+            else:
+                report["errors_truncated"] = True
+
+        async def flush() -> None:
+            (
+                inserted,
+                updated,
+                unchanged,
+            ) = await self._contact_repository.bulk_upsert_contacts(batch, user)
+            await self._record_write(user)
+            report["inserted"] += inserted
+            report["updated"] += updated
+            report["unchanged"] += unchanged
+            report["duplicates"] += len(batch) - inserted - updated - unchanged
+            batch.clear()
+
+        async for row_number, record in iter_import_records(chunks, content_type):
+            report["received"] += 1
+            if isinstance(record, str):
+                add_error(row_number, [record])
+                continue
+            try:
+                contact = ContactBase.model_validate(record)
+            except ValidationError as e:
+                add_error(
+                    row_number,
+                    [
+                        f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                        for error in e.errors()
+                    ],
+                )
+                continue
+            if len(contact.email) > IMPORT_EMAIL_MAX_LENGTH:
+                add_error(
+                    row_number,
+                    [f"email: Must be at most {IMPORT_EMAIL_MAX_LENGTH} characters"],
+                )
+                continue
+
+            batch.append(
+                (
+                    row_number,
+                    contact.first_name,
+                    contact.last_name,
+                    contact.email,
+                    contact.phone_number,
+                    contact.birthday,
+                )
+            )
+            if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+                await flush()
+
+        if batch:
+            await flush()
+
+        elapsed = time.perf_counter() - started
+        report["elapsed_seconds"] = round(elapsed, 3)
+        report["rows_per_second"] = (
+            round(report["received"] / elapsed, 1) if elapsed > 0 else None
+        )
+        return report
+
+    async def export_contacts(
+        self,
+        export_format: str,
+        first_name: str | None,
+        last_name: str | None,
+        email: str | None,
+        user: User,
+        q: str | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Serializes the user's contacts as CSV or NDJSON, yielding the output in
+        chunks of EXPORT_CHUNK_ROWS rows as they are read from the database.
+        """
+        buffer = io.StringIO()
+        writer = None
+        if export_format == "csv":
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerow(EXPORT_FIELDS)
+
+        rows = 0
+        async for contact in self._contact_repository.stream_contacts(
+            first_name, last_name, email, user, q
+        ):
+            if writer is not None:
+                writer.writerow(
+                    [_export_value(getattr(contact, f)) for f in EXPORT_FIELDS]
+                )
+            else:
+                buffer.write(
+                    json.dumps(
+                        {f: getattr(contact, f) for f in EXPORT_FIELDS},
+                        default=_export_value,
+                    )
+                )
+                buffer.write("\n")
+
+            rows += 1
+            if rows % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
     async def update_contact(
         self, contact_id: int, body: ContactUpdate, user: User
     ) -> Contact | None:
         updated_contact = await self._contact_repository.update_contact(
             contact_id, body, user
         )
+        if updated_contact is not None:
+            await self._record_write(user)
         return updated_contact
 
+    async def get_contacts_by_ids(self, ids: list[int], user: User) -> Sequence[Row]:
+        return await self._contact_repository.get_contacts_by_ids(ids, user)
+
+    async def batch_mutate_contacts(
+        self, body: ContactBatchRequest, user: User
+    ) -> dict:
+        """
+        Applies all updates and deletions in one transaction and reports a
+        status per item. A conflict on any item rolls back the whole batch.
+        """
+        ids = [item.id for item in body.update] + body.delete
+        if len(ids) != len(set(ids)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Each contact id may appear only once per batch.",
+            )
+
+        updates = [
+            item.model_dump(exclude_unset=True) | {"id": item.id}
+            for item in body.update
+        ]
+        try:
+            updated, deleted = await self._contact_repository.batch_mutate_contacts(
+                updates, body.delete, user
+            )
+        except IntegrityError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The batch conflicts with existing contacts. Nothing was changed.",
+            ) from e
+
+        if updated or deleted:
+            await self._record_write(user)
+
+        results = [
+            {
+                "id": item.id,
+                "action": "update",
+                "status": "updated" if item.id in updated else "not_found",
+            }
+            for item in body.update
+        ]
+        results += [
+            {
+                "id": contact_id,
+                "action": "delete",
+                "status": "deleted" if contact_id in deleted else "not_found",
+            }
+            for contact_id in body.delete
+        ]
+        return {"results": results}
+
     async def delete_contact(self, contact_id: int, user: User) -> Contact | None:
         deleted_contact = await self._contact_repository.delete_contact(
             contact_id, user
         )
+        if deleted_contact is not None:
+            await self._record_write(user)
         return deleted_contact
@@ -1,16 +1,33 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.database.db import get_db, session_manager
+from src.database.models import User
 from src.services.contact_service import ContactService
 from src.services.user_service import UserService
-from src.services.auth_service import AuthService
+from src.services.auth_service import AuthService, get_current_user
+
+
+async def get_read_db(
+    request: Request, current_user: User = Depends(get_current_user)
+):
+    """Yields a read-only session, routed to a replica when possible."""
+    async with session_manager.read_session(
+        current_user.id, getattr(request.state, "last_write_at", None)
+    ) as session:
+        yield session
 
 
 def get_contact_service(db: AsyncSession = Depends(get_db)) -> ContactService:
     return ContactService(db)
 
 
+def get_read_contact_service(
+    db: AsyncSession = Depends(get_read_db),
+) -> ContactService:
+    return ContactService(db)
+
+
 def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
     return UserService(db)
 
@@ -1,11 +1,14 @@
 import logging
+from email.message import EmailMessage
+from email.utils import formataddr
 from pathlib import Path
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 from pydantic import EmailStr
 
 from src.conf.config import settings
 from src.services.auth_service import AuthService
+from src.services.mail_worker import mail_worker
 
 __all__ = ["EmailService"]
 
@@ -13,39 +16,33 @@ logger = logging.getLogger(__name__)
 
 
 class EmailService:
-    conf = ConnectionConfig(
-        MAIL_USERNAME=settings.MAIL_USERNAME,
-        MAIL_PASSWORD=settings.MAIL_PASSWORD,
-        MAIL_FROM=settings.MAIL_FROM,
-        MAIL_PORT=settings.MAIL_PORT,
-        MAIL_SERVER=settings.MAIL_SERVER,
-        MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-        MAIL_STARTTLS=settings.MAIL_STARTTLS,
-        MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-        USE_CREDENTIALS=settings.USE_CREDENTIALS,
-        VALIDATE_CERTS=settings.VALIDATE_CERTS,
-        TEMPLATE_FOLDER=Path(__file__).parent / "templates",
+    templates = Environment(
+        loader=FileSystemLoader(Path(__file__).parent / "templates"),
+        autoescape=select_autoescape(["html"]),
     )
     auth_service = AuthService()
 
+    def _build_message(
+        self, recipient: str, subject: str, template_name: str, context: dict
+    ) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+        message["To"] = recipient
+        message["Subject"] = subject
+        html = self.templates.get_template(template_name).render(**context)
+        message.set_content(html, subtype="html")
+        return message
+
     async def send_verification_email(self, email: EmailStr, username: str, host: str):
         """
-        Sends an email for account verification.
+        Queues an email for account verification; the mail worker delivers it.
         """
-        try:
-            token_verification = self.auth_service.create_email_token({"sub": email})
-            message = MessageSchema(
-                subject="Confirm your email",
-                recipients=[email],
-                template_body={
-                    "host": host,
-                    "username": username,
-                    "token": token_verification,
-                },
-                subtype=MessageType.html,
-            )
-
-            fm = FastMail(self.conf)
-            await fm.send_message(message, template_name="verify_email.html")
-        except ConnectionErrors as e:
-            logger.warning("Failed to send email: %s", e)
+        token_verification = self.auth_service.create_email_token({"sub": email})
+        message = self._build_message(
+            email,
+            "Confirm your email",
+            "verify_email.html",
+            {"host": host, "username": username, "token": token_verification},
+        )
+        if not mail_worker.enqueue(message):
+            logger.warning("Verification email to %s was not queued", email)
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+
+__all__ = ["make_etag", "etag_matches"]
+
+
+def make_etag(*parts: Any) -> str:
+    """Builds a weak ETag from the string forms of `parts`."""
+    digest = hashlib.sha1(
+        "|".join(str(part) for part in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against `etag`."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
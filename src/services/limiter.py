@@ -1,19 +1,367 @@
-from fastapi import Request
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from __future__ import annotations
 
+import asyncio
+import errno
+import logging
+import math
+import os
+import socket
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable
 
-__all__ = ["limiter"]
+from fastapi import Depends, HTTPException, Request, status
 
+from src.conf.config import settings
+from src.database.models import User
+from .auth_service import get_current_user
 
-def get_limiter_key(request: Request) -> str:
+__all__ = [
+    "parse_rate",
+    "TokenBucketTable",
+    "LimiterStorage",
+    "MemoryLimiterStorage",
+    "SocketLimiterStorage",
+    "RateLimiter",
+    "limiter",
+]
+
+logger = logging.getLogger(__name__)
+
+RATE_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Idle buckets examined for eviction per acquire, keeping eviction O(1).
+EVICT_PER_ACQUIRE = 2
+
+# How long a worker keeps using its local buckets after failing to reach
+# the shared limiter socket.
+SOCKET_RETRY_SECONDS = 5.0
+
+# How long a request waits for the serving worker to answer before the
+# connection is dropped and the request is limited locally.
+SOCKET_TIMEOUT_SECONDS = 0.1
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    """Parses "5/minute" into (5, 60.0): at most 5 requests per 60 seconds."""
+    try:
+        count, period = rate.split("/")
+        capacity = int(count)
+        seconds = float(RATE_PERIODS[period.strip().rstrip("s")])
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit: {rate!r}") from None
+    if capacity <= 0:
+        raise ValueError(f"Invalid rate limit: {rate!r}")
+    return capacity, seconds
+
+
+class TokenBucketTable:
+    """
+    Token buckets keyed by string, each stored as [tokens, updated_at,
+    full_at]. Buckets are kept in least recently used order; at most
+    `max_keys` are kept, and buckets that have refilled completely are
+    dropped, since they behave exactly like a missing one.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(
+        self, key: str, capacity: int, refill_rate: float, cost: int = 1
+    ) -> float:
+        """
+        Takes `cost` tokens from the bucket for `key`, which holds up to
+        `capacity` tokens and gains `refill_rate` tokens per second. Returns
+        0.0 on success, otherwise the seconds until enough tokens are back.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(capacity)
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+            self._buckets.move_to_end(key)
+
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / refill_rate
+
+        full_at = now + (capacity - tokens) / refill_rate
+        if bucket is None:
+            self._buckets[key] = [tokens, now, full_at]
+        else:
+            bucket[:] = (tokens, now, full_at)
+
+        self._evict(now)
+        return retry_after
+
+    def _evict(self, now: float) -> None:
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        for _ in range(EVICT_PER_ACQUIRE):
+            oldest = next(iter(self._buckets.values()), None)
+            if oldest is None or oldest[2] > now:
+                break
+            self._buckets.popitem(last=False)
+
+
+class LimiterStorage(ABC):
+    @abstractmethod
+    async def acquire(
+        self, key: str, capacity: int, refill_rate: float, cost: int = 1
+    ) -> float:
+        """See TokenBucketTable.acquire."""
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryLimiterStorage(LimiterStorage):
+    """Buckets local to the process; each worker enforces its own limits."""
+
+    def __init__(self, max_keys: int):
+        self.table = TokenBucketTable(max_keys)
+
+    async def acquire(
+        self, key: str, capacity: int, refill_rate: float, cost: int = 1
+    ) -> float:
+        return self.table.acquire(key, capacity, refill_rate, cost)
+
+
+class SocketLimiterStorage(LimiterStorage):
+    """
+    Buckets shared by all workers on a node through a Unix socket at `path`
+    ("@name" for a Linux abstract socket).
+
+    The first worker that cannot connect starts the server in its own event
+    loop and answers its own requests from the table directly; the others
+    send one tab-separated line per request and read the answer back over a
+    single pipelined connection. If the serving worker exits, the others
+    reconnect and one of them takes over with empty buckets. While the socket
+    is unreachable, requests are limited per worker.
+    """
+
+    def __init__(self, path: str, max_keys: int):
+        self.path = path
+        self._table = TokenBucketTable(max_keys)
+        self._fallback = MemoryLimiterStorage(max_keys)
+        self._server: asyncio.AbstractServer | None = None
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._writer: asyncio.StreamWriter | None = None
+        self._read_task: asyncio.Task | None = None
+        self._pending: deque[asyncio.Future] = deque()
+        self._connect_lock = asyncio.Lock()
+        self._retry_at = 0.0
+
+    @property
+    def _address(self) -> str:
+        if self.path.startswith("@"):
+            return "\0" + self.path[1:]
+        return self.path
+
+    async def acquire(
+        self, key: str, capacity: int, refill_rate: float, cost: int = 1
+    ) -> float:
+        if self._server is not None:
+            return self._table.acquire(key, capacity, refill_rate, cost)
+        if self._writer is None and not await self._connect():
+            return await self._fallback.acquire(key, capacity, refill_rate, cost)
+        if self._server is not None:
+            return self._table.acquire(key, capacity, refill_rate, cost)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        key = key.replace("\t", " ").replace("\n", " ")
+        self._writer.write(f"{key}\t{capacity}\t{refill_rate}\t{cost}\n".encode())
+        try:
+            return await asyncio.wait_for(future, SOCKET_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            # Answers arrive in order, so a stalled server stalls everyone.
+            logger.warning("Rate limiter socket %s timed out", self.path)
+            self._disconnect()
+            self._retry_at = time.monotonic() + SOCKET_RETRY_SECONDS
+        except ConnectionError:
+            pass
+        return await self._fallback.acquire(key, capacity, refill_rate, cost)
+
+    async def _connect(self) -> bool:
+        async with self._connect_lock:
+            if self._writer is not None or self._server is not None:
+                return True
+            if time.monotonic() < self._retry_at:
+                return False
+            try:
+                reader, writer = await asyncio.open_unix_connection(self._address)
+            except OSError:
+                try:
+                    await self._serve()
+                    return True
+                except OSError as exc:
+                    logger.warning("Rate limiter socket %s: %s", self.path, exc)
+                    self._retry_at = time.monotonic() + SOCKET_RETRY_SECONDS
+                    return False
+            self._writer = writer
+            self._read_task = asyncio.create_task(self._read_responses(reader))
+            return True
+
+    async def _serve(self) -> None:
+        # Binding the socket ourselves: start_unix_server(path=...) would
+        # remove any socket file first, including one another worker has
+        # just bound.
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            try:
+                sock.bind(self._address)
+            except OSError as exc:
+                if exc.errno != errno.EADDRINUSE or self.path.startswith("@"):
+                    raise
+                # Only called once connecting has failed, so the file is
+                # left over from a server that exited.
+                os.unlink(self.path)
+                sock.bind(self._address)
+            self._server = await asyncio.start_unix_server(
+                self._serve_client, sock=sock
+            )
+        except OSError:
+            sock.close()
+            raise
+        logger.info("Serving rate limiter buckets on %s", self.path)
+
+    async def _serve_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._clients.add(writer)
+        try:
+            while line := await reader.readline():
+                key, capacity, refill_rate, cost = line.decode().split("\t")
+                retry_after = self._table.acquire(
+                    key, int(capacity), float(refill_rate), int(cost)
+                )
+                writer.write(f"{retry_after}\n".encode())
+                await writer.drain()
+        except (ConnectionError, ValueError) as exc:
+            logger.warning("Dropping rate limiter client: %s", exc)
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_result(float(line))
+        except (ConnectionError, ValueError) as exc:
+            logger.warning("Rate limiter connection failed: %s", exc)
+        finally:
+            if self._read_task is asyncio.current_task():
+                self._read_task = None
+                self._disconnect()
+
+    def _disconnect(self) -> None:
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError("Rate limiter went away"))
+
+    async def close(self) -> None:
+        self._disconnect()
+        if self._server is not None:
+            # Closing the clients' connections makes another worker take over.
+            self._server.close()
+            self._server = None
+            for client in list(self._clients):
+                client.close()
+            if not self.path.startswith("@"):
+                os.unlink(self.path)
+
+
+class RateLimiter:
     """
-    Defines the key for rate limiting. Prioritizes the authenticated user,
-    falls back to IP address for anonymous requests.
+    Builds FastAPI dependencies that enforce token-bucket limits. A limit
+    can be attached to a single route or to a whole router:
+
+        APIRouter(dependencies=[Depends(limiter.limit("20/minute"))])
+
+    Each route gets its own buckets unless the limits share a `scope`.
+    Rejected requests get 429 with Retry-After.
     """
-    if hasattr(request.state, "user"):
-        return str(request.state.user.id)
-    return get_remote_address(request)
+
+    def __init__(self, storage: LimiterStorage):
+        self.storage = storage
+
+    async def _hit(self, key: str, capacity: int, period: float) -> None:
+        retry_after = await self.storage.acquire(key, capacity, capacity / period)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests. Please try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    @staticmethod
+    def _scope(request: Request, scope: str | None) -> str:
+        if scope is not None:
+            return scope
+        route = request.scope.get("route")
+        return f"{request.method} {getattr(route, 'path', request.url.path)}"
+
+    def limit(
+        self, rate: str, scope: str | None = None
+    ) -> Callable[..., Awaitable[None]]:
+        """Limits requests per client address to `rate`, e.g. "20/minute"."""
+        capacity, period = parse_rate(rate)
+
+        async def dependency(request: Request) -> None:
+            client = request.client.host if request.client else "unknown"
+            await self._hit(
+                f"{self._scope(request, scope)}|ip:{client}", capacity, period
+            )
+
+        return dependency
+
+    def user_limit(
+        self, rate: str, scope: str | None = None
+    ) -> Callable[..., Awaitable[None]]:
+        """Limits requests per authenticated user to `rate`."""
+        capacity, period = parse_rate(rate)
+
+        async def dependency(
+            request: Request, current_user: User = Depends(get_current_user)
+        ) -> None:
+            await self._hit(
+                f"{self._scope(request, scope)}|user:{current_user.id}",
+                capacity,
+                period,
+            )
+
+        return dependency
+
+    async def close(self) -> None:
+        await self.storage.close()
+
+
+def _create_storage() -> LimiterStorage:
+    if settings.RATE_LIMIT_STORAGE == "memory":
+        return MemoryLimiterStorage(settings.RATE_LIMIT_MAX_KEYS)
+    if settings.RATE_LIMIT_STORAGE == "socket":
+        return SocketLimiterStorage(
+            settings.RATE_LIMIT_SOCKET_PATH, settings.RATE_LIMIT_MAX_KEYS
+        )
+    raise ValueError(f"Unknown RATE_LIMIT_STORAGE: {settings.RATE_LIMIT_STORAGE}")
 
 
-limiter = Limiter(key_func=get_limiter_key)
+limiter = RateLimiter(_create_storage())
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from email.message import EmailMessage
+
+import aiosmtplib
+
+from src.conf.config import settings
+
+__all__ = ["MailWorker", "mail_worker"]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Delivery:
+    message: EmailMessage
+    attempts: int = 0
+
+
+class MailWorker:
+    """
+    Delivers email from a bounded queue over a small pool of persistent,
+    authenticated SMTP connections. Each connection task sends message after
+    message in the same session, reconnecting after `messages_per_connection`
+    messages or `idle_timeout` seconds without use, so bursts of signups do not
+    open a TLS session per message.
+
+    A failed delivery drops its connection and is queued again after an
+    exponential, jittered backoff, up to `max_attempts` attempts. Messages the
+    server rejects with a permanent (5xx) reply are not retried. When the
+    queue is full, new messages are dropped and counted instead of blocking
+    the request that produced them.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str | None,
+        password: str | None,
+        use_tls: bool,
+        start_tls: bool,
+        validate_certs: bool,
+        connections: int,
+        queue_size: int,
+        max_attempts: int,
+        retry_base: float,
+        retry_max: float,
+        messages_per_connection: int,
+        idle_timeout: float,
+        timeout: float,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.validate_certs = validate_certs
+        self.connections = connections
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.messages_per_connection = messages_per_connection
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+
+        self._queue: asyncio.Queue[_Delivery] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._retries: set[asyncio.TimerHandle] = set()
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.dropped = 0
+        self.sessions = 0
+
+    def start(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._run_connection(), name=f"smtp-{index}")
+            for index in range(self.connections)
+        ]
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Waits up to `drain_timeout` seconds for queued mail, then stops."""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Stopping mail worker with %d undelivered messages",
+                self._queue.qsize() + len(self._retries),
+            )
+        for handle in self._retries:
+            handle.cancel()
+        self._retries.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def enqueue(self, message: EmailMessage) -> bool:
+        """Queues `message` for delivery; returns False if it was dropped."""
+        return self._put(_Delivery(message))
+
+    def _put(self, delivery: _Delivery) -> bool:
+        if self._queue is None:
+            logger.warning("Mail worker stopped; dropping %s", _describe(delivery))
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait(delivery)
+        except asyncio.QueueFull:
+            logger.warning("Mail queue is full; dropping %s", _describe(delivery))
+            self.dropped += 1
+            return False
+        return True
+
+    def _schedule_retry(self, delivery: _Delivery) -> None:
+        delay = min(self.retry_max, self.retry_base * 2 ** (delivery.attempts - 1))
+        delay *= random.uniform(0.5, 1.0)
+
+        def retry() -> None:
+            self._retries.discard(handle)
+            self._put(delivery)
+
+        handle = asyncio.get_running_loop().call_later(delay, retry)
+        self._retries.add(handle)
+        self.retried += 1
+
+    def _new_connection(self) -> aiosmtplib.SMTP:
+        return aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            validate_certs=self.validate_certs,
+            timeout=self.timeout,
+        )
+
+    async def _run_connection(self) -> None:
+        smtp = self._new_connection()
+        sent_in_session = 0
+        last_used = 0.0
+        try:
+            while True:
+                delivery = await self._queue.get()
+                delivery.attempts += 1
+                try:
+                    stale = time.monotonic() - last_used > self.idle_timeout
+                    if smtp.is_connected and (
+                        stale or sent_in_session >= self.messages_per_connection
+                    ):
+                        await _quit(smtp)
+                    if not smtp.is_connected:
+                        await smtp.connect()
+                        self.sessions += 1
+                        sent_in_session = 0
+
+                    await smtp.send_message(delivery.message)
+                    sent_in_session += 1
+                    last_used = time.monotonic()
+                    self.sent += 1
+                except (aiosmtplib.SMTPException, OSError) as exc:
+                    smtp.close()
+                    if _is_permanent(exc):
+                        logger.error("Server rejected %s: %s", _describe(delivery), exc)
+                        self.failed += 1
+                    elif delivery.attempts < self.max_attempts:
+                        logger.info("Retrying %s: %s", _describe(delivery), exc)
+                        self._schedule_retry(delivery)
+                    else:
+                        logger.error("Giving up on %s: %s", _describe(delivery), exc)
+                        self.failed += 1
+                # A message that cannot be serialized, or a bug, must cost one
+                # message rather than stop this connection task for good.
+                except Exception:  # pylint: disable=broad-exception-caught
+                    smtp.close()
+                    logger.exception("Cannot deliver %s", _describe(delivery))
+                    self.failed += 1
+                finally:
+                    self._queue.task_done()
+        finally:
+            await _quit(smtp)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "waiting_retry": len(self._retries),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "sessions": self.sessions,
+        }
+
+
+def _describe(delivery: _Delivery) -> str:
+    return f"mail to {delivery.message['To']} (attempt {delivery.attempts})"
+
+
+def _is_permanent(exc: Exception) -> bool:
+    """Whether the server answered with a 5xx reply, so retrying cannot help."""
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+        return all(error.code >= 500 for error in exc.recipients)
+    return isinstance(exc, aiosmtplib.SMTPResponseException) and exc.code >= 500
+
+
+async def _quit(smtp: aiosmtplib.SMTP) -> None:
+    if not smtp.is_connected:
+        return
+    try:
+        await smtp.quit()
+    except (aiosmtplib.SMTPException, OSError):
+        smtp.close()
+
+
+mail_worker = MailWorker(
+    hostname=settings.MAIL_SERVER,
+    port=settings.MAIL_PORT,
+    username=settings.MAIL_USERNAME if settings.USE_CREDENTIALS else None,
+    password=(
+        settings.MAIL_PASSWORD.get_secret_value() if settings.USE_CREDENTIALS else None
+    ),
+    use_tls=settings.MAIL_SSL_TLS,
+    start_tls=settings.MAIL_STARTTLS,
+    validate_certs=settings.VALIDATE_CERTS,
+    connections=settings.MAIL_WORKER_CONNECTIONS,
+    queue_size=settings.MAIL_QUEUE_SIZE,
+    max_attempts=settings.MAIL_MAX_ATTEMPTS,
+    retry_base=settings.MAIL_RETRY_BASE_SECONDS,
+    retry_max=settings.MAIL_RETRY_MAX_SECONDS,
+    messages_per_connection=settings.MAIL_MESSAGES_PER_CONNECTION,
+    idle_timeout=settings.MAIL_IDLE_TIMEOUT_SECONDS,
+    timeout=settings.MAIL_TIMEOUT_SECONDS,
+)
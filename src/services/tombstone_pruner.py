@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.conf.config import settings
+from src.database.db import session_manager
+from src.repository import ContactRepository
+
+__all__ = ["TombstonePruner", "tombstone_pruner"]
+
+logger = logging.getLogger(__name__)
+
+
+class TombstonePruner:
+    """
+    Deletes contact tombstones older than `retention` every `interval`
+    seconds, `batch_size` rows per transaction so the sweep never holds many
+    row locks or produces one large WAL burst. get_changes() rejects sync
+    tokens older than the same retention, so no client can still need them.
+    """
+
+    def __init__(self, retention: datetime.timedelta, interval: float, batch_size: int):
+        self.retention = retention
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: asyncio.Task | None = None
+        self.pruned = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="tombstone-pruner")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def prune(self) -> int:
+        """Deletes every expired tombstone, batch by batch; returns the count."""
+        pruned = 0
+        while True:
+            async with session_manager.session() as session:
+                deleted = await ContactRepository(session).delete_expired_tombstones(
+                    self.retention, self.batch_size
+                )
+            pruned += deleted
+            if deleted < self.batch_size:
+                break
+        self.pruned += pruned
+        return pruned
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                pruned = await self.prune()
+            except (SQLAlchemyError, OSError):
+                logger.exception("Pruning contact tombstones failed")
+            else:
+                if pruned:
+                    logger.info("Pruned %d expired contact tombstones", pruned)
+            await asyncio.sleep(self.interval)
+
+
+tombstone_pruner = TombstonePruner(
+    retention=datetime.timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS),
+    interval=settings.SYNC_TOMBSTONE_PRUNE_INTERVAL_SECONDS,
+    batch_size=5_000,
+)
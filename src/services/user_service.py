@@ -34,7 +34,7 @@ class UserService:
                 status_code=status.HTTP_409_CONFLICT,
                 detail="User with this email already exists.",
             )
-        hashed_password = self._auth_service.hash_password(body.password)
+        hashed_password = await self._auth_service.hash_password(body.password)
 
         avatar_url = None
         try:
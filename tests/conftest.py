@@ -0,0 +1,108 @@
+"""
+Database tests run against the Postgres database at TEST_DATABASE_URL, e.g.
+
+    TEST_DATABASE_URL=postgresql+asyncpg://postgres:pw@localhost:5432/contacts_test
+
+which must already be migrated (`alembic upgrade head`). Each test runs
+inside a transaction that is rolled back afterwards, so the database is left
+as it was. Without TEST_DATABASE_URL these tests are skipped.
+"""
+
+import os
+from typing import Any, AsyncIterator
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.database.models import User
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+class StatementCounter:
+    """
+    Records the SQL statements sent to the database, leaving out the
+    savepoint commands the test transaction wraps around repository commits.
+    """
+
+    IGNORED_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def before_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        if not statement.lstrip().upper().startswith(self.IGNORED_PREFIXES):
+            self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+
+@pytest.fixture
+async def db_connection() -> AsyncIterator[AsyncConnection]:
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.connect() as connection:
+            transaction = await connection.begin()
+            try:
+                yield connection
+            finally:
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+async def db_session(db_connection: AsyncConnection) -> AsyncIterator[AsyncSession]:
+    # Repository commits only release a savepoint, so everything stays inside
+    # the test transaction.
+    session = AsyncSession(
+        bind=db_connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False,
+    )
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+@pytest.fixture
+def statement_counter(db_connection: AsyncConnection) -> StatementCounter:
+    counter = StatementCounter()
+    event.listen(
+        db_connection.sync_engine,
+        "before_cursor_execute",
+        counter.before_cursor_execute,
+    )
+    return counter
+
+
+@pytest.fixture
+async def user(db_session: AsyncSession) -> User:
+    user = User(
+        username="test_user",
+        email="test_user@example.com",
+        hashed_password="not-a-hash",
+        verified=True,
+    )
+    db_session.add(user)
+    await db_session.flush()
+    return user
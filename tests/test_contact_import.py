@@ -0,0 +1,117 @@
+from src.services.contact_import import MAX_RECORD_LENGTH, iter_import_records
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def _records(*parts: bytes, content_type: str = "text/csv") -> list:
+    return [
+        record async for record in iter_import_records(_chunks(*parts), content_type)
+    ]
+
+
+HEADER = b"first_name,last_name,email\n"
+
+
+async def test_csv_rows_are_keyed_by_header():
+    records = await _records(HEADER, b"Jane,Doe,jane@example.com\n")
+
+    assert records == [
+        (1, {"first_name": "Jane", "last_name": "Doe", "email": "jane@example.com"})
+    ]
+
+
+async def test_csv_quoted_field_may_span_lines_and_chunks():
+    records = await _records(
+        HEADER, b'"Jane\nMary",Doe,ja', b"ne@example.com\nJohn,Roe,john@example.com\n"
+    )
+
+    assert [row for row, _ in records] == [1, 2]
+    assert records[0][1]["first_name"] == "Jane\nMary"
+    assert records[1][1]["first_name"] == "John"
+
+
+async def test_csv_stray_quote_inside_field_is_literal():
+    records = await _records(
+        HEADER,
+        b'Shaun,O"Neil,shaun@example.com\n',
+        b"John,Roe,john@example.com\n",
+    )
+
+    assert records == [
+        (
+            1,
+            {
+                "first_name": "Shaun",
+                "last_name": 'O"Neil',
+                "email": "shaun@example.com",
+            },
+        ),
+        (2, {"first_name": "John", "last_name": "Roe", "email": "john@example.com"}),
+    ]
+
+
+async def test_csv_escaped_quotes_inside_quoted_field():
+    records = await _records(HEADER, b'"Jo ""JJ""",Roe,"a,b@example.com"\n')
+
+    assert records == [
+        (1, {"first_name": 'Jo "JJ"', "last_name": "Roe", "email": "a,b@example.com"})
+    ]
+
+
+async def test_csv_oversized_record_is_reported_and_skipped():
+    long_line = b"x" * (MAX_RECORD_LENGTH * 2) + b",Doe,jane@example.com\n"
+    records = await _records(
+        HEADER, long_line[:1000], long_line[1000:], b"John,Roe,john@example.com\n"
+    )
+
+    assert records[0] == (1, f"Record exceeds {MAX_RECORD_LENGTH} characters")
+    assert records[1][1]["first_name"] == "John"
+
+
+async def test_csv_unclosed_quote_is_capped():
+    lines = [b'Jane,"Doe,jane@example.com\n'] + [b"y" * 100 + b"\n"] * 500
+    records = await _records(HEADER, *lines)
+
+    assert isinstance(records[0][1], str)
+    assert "exceeds" in records[0][1]
+
+
+async def test_csv_unterminated_quote_at_end():
+    records = await _records(HEADER, b'Jane,"Doe,jane@example.com\n')
+
+    assert records == [(1, "Unterminated quoted field")]
+
+
+async def test_ndjson_oversized_line_is_reported():
+    records = await _records(
+        b'{"first_name": "' + b"x" * MAX_RECORD_LENGTH + b'"}\n',
+        b'{"first_name": "Jane"}\n',
+        content_type="application/x-ndjson",
+    )
+
+    assert records == [
+        (1, f"Record exceeds {MAX_RECORD_LENGTH} characters"),
+        (2, {"first_name": "Jane"}),
+    ]
+
+
+async def test_csv_unparseable_row_is_reported_and_skipped():
+    records = await _records(
+        HEADER, b"Jane,Do\re,jane@example.com\n", b"John,Roe,john@example.com\n"
+    )
+
+    assert records[0][0] == 1 and records[0][1].startswith("Invalid CSV:")
+    assert records[1] == (
+        2,
+        {"first_name": "John", "last_name": "Roe", "email": "john@example.com"},
+    )
+
+
+async def test_csv_carriage_return_line_endings_are_reported():
+    records = await _records(b"first_name,last_name,email\rJane,Doe,jane@example.com\r")
+
+    assert len(records) == 1
+    assert records[0][0] == 0 and records[0][1].startswith("Invalid CSV header:")
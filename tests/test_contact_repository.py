@@ -0,0 +1,183 @@
+import datetime
+
+from sqlalchemy import text
+
+from src.repository import ContactRepository
+from src.schemas import ContactUpdate
+from src.services import ContactService
+
+
+def _contact_data(email: str = "jane@example.com") -> dict:
+    return {
+        "first_name": "Jane",
+        "last_name": "Doe",
+        "email": email,
+        "phone_number": "+380501234567",
+        "birthday": datetime.date(1990, 5, 17),
+    }
+
+
+async def test_create_contact_is_one_statement(db_session, user, statement_counter):
+    repository = ContactRepository(db_session)
+
+    statement_counter.reset()
+    contact = await repository.create_contact(_contact_data(), user)
+
+    assert contact is not None
+    assert contact.id is not None
+    assert contact.user_id == user.id
+    assert contact.created_at is not None
+    assert statement_counter.count == 1
+
+
+async def test_create_duplicate_contact_returns_none_in_one_statement(
+    db_session, user, statement_counter
+):
+    repository = ContactRepository(db_session)
+    await repository.create_contact(_contact_data(), user)
+
+    statement_counter.reset()
+    duplicate = await repository.create_contact(_contact_data(), user)
+
+    assert duplicate is None
+    assert statement_counter.count == 1
+
+
+async def test_update_contact_is_one_statement(db_session, user, statement_counter):
+    repository = ContactRepository(db_session)
+    contact = await repository.create_contact(_contact_data(), user)
+
+    statement_counter.reset()
+    updated = await repository.update_contact(
+        contact.id, ContactUpdate(phone_number="+380509999999"), user
+    )
+
+    assert updated is not None
+    assert updated.phone_number == "+380509999999"
+    assert updated.first_name == "Jane"
+    assert statement_counter.count == 1
+
+
+async def test_update_missing_contact_returns_none(db_session, user, statement_counter):
+    repository = ContactRepository(db_session)
+
+    statement_counter.reset()
+    updated = await repository.update_contact(
+        -1, ContactUpdate(phone_number="+380509999999"), user
+    )
+
+    assert updated is None
+    assert statement_counter.count == 1
+
+
+async def test_delete_contact_writes_row_and_tombstone(
+    db_session, user, statement_counter
+):
+    repository = ContactRepository(db_session)
+    contact = await repository.create_contact(_contact_data(), user)
+
+    statement_counter.reset()
+    deleted = await repository.delete_contact(contact.id, user)
+
+    assert deleted is not None
+    assert deleted.id == contact.id
+    # DELETE ... RETURNING, then the tombstone INSERT flushed on commit.
+    assert statement_counter.count == 2
+    assert await repository.get_contact_by_id(contact.id, user) is None
+
+
+async def _row_versions(db_session, user) -> dict[int, str]:
+    result = await db_session.execute(
+        text("SELECT id, xmin::text FROM contacts WHERE user_id = :user_id"),
+        {"user_id": user.id},
+    )
+    return dict(result.all())
+
+
+async def test_bulk_upsert_rewrites_only_changed_contacts(db_session, user):
+    repository = ContactRepository(db_session)
+    unchanged = await repository.create_contact(_contact_data("jane@example.com"), user)
+    changed = await repository.create_contact(_contact_data("john@example.com"), user)
+    before = await _row_versions(db_session, user)
+
+    birthday = datetime.date(1990, 5, 17)
+    rows = [
+        (1, "Jane", "Doe", "jane@example.com", "+380501234567", birthday),
+        (2, "Jane", "Doe", "john@example.com", "+380509999999", birthday),
+        (3, "Ann", "Lee", "ann@example.com", None, None),
+        (4, "Ann", "Lee", "ann@example.com", None, None),
+    ]
+    counts = await repository.bulk_upsert_contacts(rows, user)
+
+    assert counts == (1, 1, 1)
+    after = await _row_versions(db_session, user)
+    assert after[unchanged.id] == before[unchanged.id]
+    assert after[changed.id] != before[changed.id]
+    (row,) = await repository.get_contacts_by_ids([changed.id], user)
+    assert row.phone_number == "+380509999999"
+
+
+async def test_batch_update_group_of_nulls(db_session, user):
+    repository = ContactRepository(db_session)
+    jane = await repository.create_contact(_contact_data("jane@example.com"), user)
+    john = await repository.create_contact(_contact_data("john@example.com"), user)
+
+    updates = [
+        {"id": jane.id, "birthday": None, "phone_number": None},
+        {"id": john.id, "birthday": None, "phone_number": None},
+    ]
+    updated, deleted = await repository.batch_mutate_contacts(updates, [], user)
+
+    assert updated == {jane.id, john.id}
+    assert deleted == set()
+    rows = await repository.get_contacts_by_ids([jane.id, john.id], user)
+    assert [(row.birthday, row.phone_number) for row in rows] == [(None, None)] * 2
+
+
+async def test_batch_update_mixes_values_and_nulls(db_session, user):
+    repository = ContactRepository(db_session)
+    jane = await repository.create_contact(_contact_data("jane@example.com"), user)
+    john = await repository.create_contact(_contact_data("john@example.com"), user)
+
+    updates = [
+        {"id": jane.id, "birthday": None},
+        {"id": john.id, "birthday": datetime.date(2001, 2, 3)},
+    ]
+    updated, _ = await repository.batch_mutate_contacts(updates, [], user)
+
+    assert updated == {jane.id, john.id}
+    rows = await repository.get_contacts_by_ids([jane.id, john.id], user)
+    assert [row.birthday for row in rows] == [None, datetime.date(2001, 2, 3)]
+
+
+async def test_contacts_version_changes_with_every_write(db_session, user):
+    repository = ContactRepository(db_session)
+    versions = [await repository.get_contacts_version(user)]
+
+    jane = await repository.create_contact(_contact_data("jane@example.com"), user)
+    versions.append(await repository.get_contacts_version(user))
+    await repository.update_contact(jane.id, ContactUpdate(last_name="Roe"), user)
+    versions.append(await repository.get_contacts_version(user))
+    await repository.update_contact(-1, ContactUpdate(last_name="Roe"), user)
+    versions.append(await repository.get_contacts_version(user))
+    await repository.delete_contact(jane.id, user)
+    versions.append(await repository.get_contacts_version(user))
+
+    # The update that matched no contact leaves the version alone.
+    assert versions[0] < versions[1] < versions[2] == versions[3] < versions[4]
+
+
+async def test_contacts_etag_changes_when_updated_at_and_count_do_not(
+    db_session, user
+):
+    # now() is fixed for the test transaction, so the update below keeps the
+    # latest updated_at and the row count of the listing the same.
+    repository = ContactRepository(db_session)
+    jane = await repository.create_contact(_contact_data("jane@example.com"), user)
+    await repository.create_contact(_contact_data("john@example.com"), user)
+    service = ContactService(db_session)
+    before = await service.get_contacts_etag(user, "/contacts", [])
+
+    await repository.update_contact(jane.id, ContactUpdate(last_name="Roe"), user)
+
+    assert await service.get_contacts_etag(user, "/contacts", []) != before
@@ -0,0 +1,29 @@
+import pytest
+from pydantic import ValidationError
+
+from src.schemas import ContactBase, ContactBatchUpdate
+
+
+def test_batch_update_omitted_names_are_unset():
+    item = ContactBatchUpdate(id=1, phone_number=None)
+
+    assert item.model_dump(exclude_unset=True) == {"id": 1, "phone_number": None}
+
+
+@pytest.mark.parametrize("field", ["first_name", "last_name"])
+def test_batch_update_rejects_null_names(field):
+    with pytest.raises(ValidationError) as error:
+        ContactBatchUpdate.model_validate({"id": 1, field: None})
+
+    assert error.value.errors()[0]["loc"] == (field,)
+
+
+@pytest.mark.parametrize("field", ["first_name", "last_name", "phone_number"])
+def test_contact_rejects_nul_characters(field):
+    data = {"first_name": "Jane", "last_name": "Doe", "email": "jane@example.com"}
+    data[field] = "Ja\x00ne"
+
+    with pytest.raises(ValidationError) as error:
+        ContactBase.model_validate(data)
+
+    assert error.value.errors()[0]["loc"] == (field,)
@@ -0,0 +1,80 @@
+import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from src.database.models import ContactTombstone
+from src.repository import ContactRepository
+from src.services import ContactService
+from src.services.pagination import encode_cursor
+
+
+async def _db_now(db_session) -> datetime.datetime:
+    return (await db_session.execute(select(func.now()))).scalar_one()
+
+
+def _since(at: datetime.datetime) -> str:
+    return encode_cursor([at.isoformat(), 0, at.isoformat(), 0])
+
+
+async def _add_tombstone(db_session, user, contact_id, deleted_at) -> None:
+    db_session.add(
+        ContactTombstone(user_id=user.id, contact_id=contact_id, deleted_at=deleted_at)
+    )
+    await db_session.flush()
+
+
+async def test_full_sync_skips_tombstones(db_session, user):
+    now = await _db_now(db_session)
+    await _add_tombstone(db_session, user, -1, now - datetime.timedelta(hours=1))
+    service = ContactService(db_session)
+
+    full = await service.get_changes(None, 100, user)
+    incremental = await service.get_changes(
+        _since(now - datetime.timedelta(days=1)), 100, user
+    )
+
+    assert full["deleted"] == []
+    assert incremental["deleted"] == [-1]
+
+
+async def test_full_sync_token_resumes_after_existing_tombstones(db_session, user):
+    now = await _db_now(db_session)
+    await _add_tombstone(db_session, user, -1, now - datetime.timedelta(hours=1))
+    service = ContactService(db_session)
+
+    full = await service.get_changes(None, 100, user)
+    following = await service.get_changes(full["next_since"], 100, user)
+
+    assert following["deleted"] == []
+
+
+async def test_sync_token_older_than_retention_is_gone(db_session, user):
+    now = await _db_now(db_session)
+    service = ContactService(db_session)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.get_changes(_since(now - datetime.timedelta(days=31)), 100, user)
+
+    assert exc_info.value.status_code == 410
+
+
+async def test_delete_expired_tombstones_keeps_recent_ones(db_session, user):
+    now = await _db_now(db_session)
+    for contact_id in range(1, 4):
+        await _add_tombstone(
+            db_session, user, contact_id, now - datetime.timedelta(days=40)
+        )
+    await _add_tombstone(db_session, user, 4, now - datetime.timedelta(days=1))
+    repository = ContactRepository(db_session)
+    retention = datetime.timedelta(days=30)
+
+    first = await repository.delete_expired_tombstones(retention, 2)
+    second = await repository.delete_expired_tombstones(retention, 2)
+    result = await db_session.execute(
+        select(ContactTombstone.contact_id).where(ContactTombstone.user_id == user.id)
+    )
+
+    assert (first, second) == (2, 1)
+    assert result.scalars().all() == [4]
@@ -0,0 +1,48 @@
+import asyncio
+import socket
+
+from src.services.limiter import SocketLimiterStorage
+
+
+async def test_first_worker_serves_and_others_connect(tmp_path):
+    path = str(tmp_path / "limiter.sock")
+    first = SocketLimiterStorage(path, max_keys=100)
+    second = SocketLimiterStorage(path, max_keys=100)
+    try:
+        assert await first.acquire("key", 1, 1.0) == 0.0
+        assert await second.acquire("key", 1, 1.0) > 0
+        assert first._server is not None and second._server is None
+    finally:
+        await second.close()
+        await first.close()
+
+
+async def test_stale_socket_file_is_replaced(tmp_path):
+    path = str(tmp_path / "limiter.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+
+    storage = SocketLimiterStorage(path, max_keys=100)
+    try:
+        assert await storage.acquire("key", 1, 1.0) == 0.0
+        assert storage._server is not None
+    finally:
+        await storage.close()
+
+
+async def test_stalled_server_falls_back_to_local_buckets(tmp_path):
+    path = str(tmp_path / "limiter.sock")
+
+    async def never_answer(reader, writer):
+        await reader.read()
+
+    server = await asyncio.start_unix_server(never_answer, path=path)
+    storage = SocketLimiterStorage(path, max_keys=100)
+    try:
+        assert await storage.acquire("key", 1, 1.0) == 0.0
+        assert await storage.acquire("key", 1, 1.0) > 0
+        assert storage._writer is None and not storage._pending
+    finally:
+        await storage.close()
+        server.close()
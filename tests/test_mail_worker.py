@@ -0,0 +1,72 @@
+import asyncio
+from email.message import EmailMessage
+
+import aiosmtplib
+
+from src.services.mail_worker import MailWorker
+
+
+class _FakeSMTP:
+    def __init__(self, error: Exception):
+        self.error = error
+        self.is_connected = False
+        self.attempts = 0
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def send_message(self, message):
+        self.attempts += 1
+        raise self.error
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+async def _deliver(error: Exception) -> tuple[MailWorker, _FakeSMTP]:
+    worker = MailWorker(
+        hostname="localhost",
+        port=25,
+        username=None,
+        password=None,
+        use_tls=False,
+        start_tls=False,
+        validate_certs=False,
+        connections=1,
+        queue_size=10,
+        max_attempts=3,
+        retry_base=0.0,
+        retry_max=0.0,
+        messages_per_connection=100,
+        idle_timeout=60.0,
+        timeout=5.0,
+    )
+    smtp = _FakeSMTP(error)
+    worker._new_connection = lambda: smtp
+    message = EmailMessage()
+    message["To"] = "user@example.com"
+    worker.start()
+    worker.enqueue(message)
+    while not worker.failed:
+        await asyncio.sleep(0.01)
+    await worker.stop(drain_timeout=1.0)
+    return worker, smtp
+
+
+async def test_permanent_rejection_is_not_retried():
+    worker, smtp = await _deliver(
+        aiosmtplib.SMTPRecipientRefused(550, "No such user", "user@example.com")
+    )
+
+    assert smtp.attempts == 1
+    assert (worker.retried, worker.failed) == (0, 1)
+
+
+async def test_transient_failure_is_retried():
+    worker, smtp = await _deliver(aiosmtplib.SMTPResponseException(451, "Try later"))
+
+    assert smtp.attempts == 3
+    assert (worker.retried, worker.failed) == (2, 1)
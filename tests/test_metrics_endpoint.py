@@ -0,0 +1,31 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import SecretStr
+
+from src.api.util_router import health_router
+from src.conf.config import settings
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(health_router)
+    return TestClient(app)
+
+
+def test_metrics_hidden_without_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+
+    assert _client().get("/utils/metrics").status_code == 404
+
+
+def test_metrics_require_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", SecretStr("s3cret"))
+    client = _client()
+
+    assert client.get("/utils/metrics").status_code == 401
+    wrong = {"Authorization": "Bearer wrong"}
+    assert client.get("/utils/metrics", headers=wrong).status_code == 401
+    right = {"Authorization": "Bearer s3cret"}
+    response = client.get("/utils/metrics", headers=right)
+    assert response.status_code == 200
+    assert "db_pools" in response.json()
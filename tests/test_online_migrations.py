@@ -0,0 +1,57 @@
+import pytest
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.database.online_migrations import (
+    LOCK_TIMEOUT_MS,
+    add_check_not_valid,
+    create_index_concurrently,
+    set_not_null,
+)
+
+from tests.conftest import TEST_DATABASE_URL, StatementCounter
+
+
+def _run_migration(connection, statements: StatementCounter) -> str:
+    connection.execute(text("CREATE TEMP TABLE online_migration (id int, name text)"))
+    connection.execute(text("INSERT INTO online_migration VALUES (1, 'a')"))
+    connection.commit()
+    event.listen(connection, "before_cursor_execute", statements.before_cursor_execute)
+    context = MigrationContext.configure(
+        connection, opts={"transaction_per_migration": True}
+    )
+    with Operations.context(context), context.begin_transaction(_per_migration=True):
+        add_check_not_valid("online_migration_id", "online_migration", "id > 0")
+        create_index_concurrently("ix_online_migration_id", "online_migration", ["id"])
+        set_not_null("online_migration", "name")
+    event.remove(connection, "before_cursor_execute", statements.before_cursor_execute)
+    return connection.execute(text("SHOW lock_timeout")).scalar_one()
+
+
+async def test_autocommit_steps_run_with_lock_timeout():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    statements = StatementCounter()
+    try:
+        async with engine.connect() as connection:
+            lock_timeout = await connection.run_sync(_run_migration, statements)
+    finally:
+        await engine.dispose()
+
+    assert lock_timeout == "0"
+    locking = [
+        index
+        for index, statement in enumerate(statements.statements)
+        if statement.startswith(("CREATE INDEX", "ALTER TABLE"))
+        and "NOT VALID" not in statement
+    ]
+    # CREATE INDEX, VALIDATE CONSTRAINT, SET NOT NULL and DROP CONSTRAINT.
+    assert len(locking) == 4
+    for index in locking:
+        before = [s for s in statements.statements[:index] if "lock_timeout" in s]
+        assert before[-1] == f"SET lock_timeout = {LOCK_TIMEOUT_MS}"
+    assert statements.statements[-1] == "RESET lock_timeout"
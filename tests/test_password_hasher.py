@@ -0,0 +1,15 @@
+import multiprocessing
+
+from src.services.password_hasher import PasswordHasher, _hash
+
+
+async def test_process_workers_are_not_forked_from_the_app():
+    hasher = PasswordHasher("process", max_workers=1, max_pending=4)
+    try:
+        assert await hasher.verify("secret", _hash("secret"))
+        start_method = hasher._get_executor()._mp_context.get_start_method()
+    finally:
+        hasher.shutdown()
+
+    assert start_method != "fork"
+    assert start_method in multiprocessing.get_all_start_methods()
@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+from sqlalchemy.util import greenlet_spawn
+
+from src.database.pool_metrics import InstrumentedQueuePool
+
+
+class _Connection:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _slow_connect() -> _Connection:
+    time.sleep(0.05)
+    return _Connection()
+
+
+async def test_opening_connections_is_not_counted_as_waiting():
+    pool = InstrumentedQueuePool(_slow_connect, pool_size=1, max_overflow=0)
+
+    connection = await greenlet_spawn(pool.connect)
+    await greenlet_spawn(connection.close)
+
+    assert pool.metrics.wait_seconds.count == 1
+    assert pool.metrics.wait_seconds.max < 0.01
+    assert not pool._connecting
+
+
+async def test_waiting_for_a_checked_out_connection_is_counted():
+    pool = InstrumentedQueuePool(_slow_connect, pool_size=1, max_overflow=0)
+    connection = await greenlet_spawn(pool.connect)
+
+    async def release_later():
+        await asyncio.sleep(0.1)
+        await greenlet_spawn(connection.close)
+
+    release = asyncio.create_task(release_later())
+    second = await greenlet_spawn(pool.connect)
+    await release
+    await greenlet_spawn(second.close)
+
+    assert pool.metrics.wait_seconds.count == 2
+    assert 0.09 < pool.metrics.wait_seconds.max < 0.15
+
+
+async def test_recent_wait_includes_checkouts_still_waiting():
+    pool = InstrumentedQueuePool(_slow_connect, pool_size=1, max_overflow=0)
+    held = await greenlet_spawn(pool.connect)
+    # Past samples were fast, and the average has decayed.
+    assert pool.metrics.recent_wait() < 0.01
+
+    waiting = asyncio.create_task(greenlet_spawn(pool.connect))
+    await asyncio.sleep(0.2)
+    assert not waiting.done()
+    assert pool.metrics.recent_wait() >= 0.2
+
+    await greenlet_spawn(held.close)
+    second = await waiting
+    await greenlet_spawn(second.close)
+    assert not pool.metrics._waiting
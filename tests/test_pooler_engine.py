@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy.pool import NullPool
+
+from src.conf.config import settings
+from src.database import db
+from src.database.pool_metrics import InstrumentedQueuePool
+
+URL = "postgresql+asyncpg://postgres@127.0.0.1:6432/db"
+
+
+@pytest.mark.parametrize(
+    "prepared, poolclass", [(False, NullPool), (True, InstrumentedQueuePool)]
+)
+async def test_pooler_engine_pools_only_with_prepared_statements(
+    monkeypatch, prepared, poolclass
+):
+    monkeypatch.setattr(settings, "DB_POOLER_MODE", "pgbouncer")
+    monkeypatch.setattr(settings, "DB_POOLER_PREPARED_STATEMENTS", prepared)
+
+    engine = db._create_engine(URL)
+    try:
+        assert type(engine.pool) is poolclass
+    finally:
+        await engine.dispose()
@@ -0,0 +1,323 @@
+"""
+Checks that the repository queries are served by indexes.
+
+Seeds users, contacts, contact counts and tombstones inside the test
+transaction, runs every ContactRepository and UserRepository query, writes
+included, while capturing the SQL it sends, and EXPLAINs each statement. Any plan that reads a checked table with a
+sequential scan fails the test.
+"""
+
+import datetime
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from src.database.models import User
+from src.repository import ContactRepository, UserRepository
+from src.schemas import ContactUpdate, UserCreate
+
+# Tables large enough in production that a sequential scan is a regression.
+CHECKED_TABLES = frozenset(
+    {"users", "contacts", "contact_counts", "contact_tombstones"}
+)
+
+SEED_PREFIX = "plancheck_"
+SEED_USERS = 5_000
+SEED_USERS_WITH_CONTACTS = 20
+SEED_CONTACTS_PER_USER = 2_000
+
+SEED_USERS_SQL = """
+INSERT INTO users (username, email, hashed_password, verified, created_at, updated_at)
+SELECT CAST(:prefix AS text) || g, CAST(:prefix AS text) || g || '@example.com',
+    '', true, now(), now()
+FROM generate_series(1, :users) AS g
+"""
+SEED_CONTACTS_SQL = """
+INSERT INTO contacts (
+    user_id, first_name, last_name, email, phone_number, birthday,
+    created_at, updated_at
+)
+SELECT
+    u.id,
+    'First' || g,
+    'Last' || (g % 500),
+    'contact' || g || '@example.com',
+    '+380' || lpad(g::text, 9, '0'),
+    date '1980-01-01' + (g % 366),
+    now() - make_interval(secs => g),
+    now() - make_interval(secs => g)
+FROM (
+    SELECT id FROM users
+    WHERE username LIKE CAST(:prefix AS text) || '%'
+    ORDER BY id
+    LIMIT :owners
+) AS u
+CROSS JOIN generate_series(1, :per_user) AS g
+"""
+# The insert trigger only creates counters for users with contacts; every
+# user has one in production once they add a contact.
+SEED_CONTACT_COUNTS_SQL = """
+INSERT INTO contact_counts (user_id, contact_count)
+SELECT id, 0 FROM users WHERE username LIKE CAST(:prefix AS text) || '%'
+ON CONFLICT (user_id) DO NOTHING
+"""
+SEED_TOMBSTONES_SQL = """
+INSERT INTO contact_tombstones (user_id, contact_id, deleted_at)
+SELECT user_id, -id, updated_at FROM contacts
+WHERE user_id IN (
+    SELECT id FROM users WHERE username LIKE CAST(:prefix AS text) || '%'
+)
+"""
+
+
+@dataclass
+class _Capture:
+    label: str | None = None
+    statements: list[tuple[str, str, Any]] = field(default_factory=list)
+
+    def before_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        if self.label is None or executemany:
+            return
+        if statement.lstrip().split(None, 1)[0].upper() in (
+            "SELECT",
+            "WITH",
+            "INSERT",
+            "UPDATE",
+            "DELETE",
+        ):
+            self.statements.append((self.label, statement, parameters))
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in (
+        CHECKED_TABLES
+    ):
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", ()):
+        found.extend(_seq_scans(child))
+    return found
+
+
+async def _seed(connection: AsyncConnection) -> User:
+    params = {"prefix": SEED_PREFIX}
+    await connection.execute(text(SEED_USERS_SQL), {**params, "users": SEED_USERS})
+    await connection.execute(
+        text(SEED_CONTACTS_SQL),
+        {
+            **params,
+            "owners": SEED_USERS_WITH_CONTACTS,
+            "per_user": SEED_CONTACTS_PER_USER,
+        },
+    )
+    await connection.execute(text(SEED_CONTACT_COUNTS_SQL), params)
+    await connection.execute(text(SEED_TOMBSTONES_SQL), params)
+    for table in sorted(CHECKED_TABLES):
+        await connection.execute(text(f"ANALYZE {table}"))
+
+    result = await connection.execute(
+        text(
+            "SELECT id, username, email FROM users "
+            "WHERE username LIKE CAST(:prefix AS text) || '%' ORDER BY id LIMIT 1"
+        ),
+        params,
+    )
+    user_id, username, email = result.one()
+    return User(id=user_id, username=username, email=email)
+
+
+def _repository_queries(
+    session: AsyncSession, user: User
+) -> list[tuple[str, Callable[[], Awaitable[Any]]]]:
+    users = UserRepository(session)
+    contacts = ContactRepository(session)
+    epoch = (datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc), 0)
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    async def first_exported() -> None:
+        stream = contacts.stream_contacts(None, None, None, user)
+        async for _ in stream:
+            break
+        await stream.aclose()
+
+    contact_data = {
+        "first_name": "Plan",
+        "last_name": "Check",
+        "email": f"{SEED_PREFIX}new@example.com",
+        "phone_number": "+380000000000",
+        "birthday": datetime.date(1990, 1, 1),
+    }
+    import_rows = [
+        (1, "Plan", "Check", f"{SEED_PREFIX}import@example.com", None, None),
+        (2, "First1", "Last1", "contact1@example.com", "+380000000001", None),
+    ]
+    batch_updates = [
+        {"id": 0, "phone_number": "+380000000000"},
+        {"id": -1, "birthday": None},
+        {"id": -2},
+    ]
+    new_user = UserCreate(
+        username=f"{SEED_PREFIX}new",
+        email=f"{SEED_PREFIX}new@example.com",
+        password="not-a-password",
+    )
+
+    return [
+        ("UserRepository.get_user_by_id", lambda: users.get_user_by_id(user.id)),
+        (
+            "UserRepository.get_user_by_email",
+            lambda: users.get_user_by_email(user.email),
+        ),
+        (
+            "UserRepository.get_user_by_username",
+            lambda: users.get_user_by_username(user.username),
+        ),
+        (
+            "ContactRepository.get_contact_by_id",
+            lambda: contacts.get_contact_by_id(1, user),
+        ),
+        (
+            "ContactRepository.get_contacts",
+            lambda: contacts.get_contacts(0, 50, None, None, None, user),
+        ),
+        (
+            "ContactRepository.get_contacts(after)",
+            lambda: contacts.get_contacts(
+                0, 50, None, None, None, user, after=("Last1", "First1", 0)
+            ),
+        ),
+        (
+            "ContactRepository.get_contacts(with_total)",
+            lambda: contacts.get_contacts(
+                0, 50, None, None, None, user, with_total=True
+            ),
+        ),
+        (
+            "ContactRepository.get_contacts(last_name)",
+            lambda: contacts.get_contacts(0, 50, None, "ast12", None, user),
+        ),
+        (
+            "ContactRepository.get_contacts(q)",
+            lambda: contacts.get_contacts(0, 50, None, None, None, user, q="rst12"),
+        ),
+        (
+            "ContactRepository.count_contacts",
+            lambda: contacts.count_contacts(None, None, None, user),
+        ),
+        (
+            "ContactRepository.get_contacts_by_ids",
+            lambda: contacts.get_contacts_by_ids([1, 2, 3], user),
+        ),
+        (
+            "ContactRepository.get_contacts_version",
+            lambda: contacts.get_contacts_version(user),
+        ),
+        (
+            "ContactRepository.get_contact_count",
+            lambda: contacts.get_contact_count(user),
+        ),
+        (
+            "ContactRepository.get_contact_updated_at",
+            lambda: contacts.get_contact_updated_at(1, user),
+        ),
+        ("ContactRepository.stream_contacts", first_exported),
+        (
+            "ContactRepository.get_upcoming_birthdays",
+            lambda: contacts.get_upcoming_birthdays(user),
+        ),
+        (
+            "ContactRepository.get_sync_horizon",
+            lambda: contacts.get_sync_horizon(10.0),
+        ),
+        (
+            "ContactRepository.get_changed_contacts",
+            lambda: contacts.get_changed_contacts(epoch, now, 500, user),
+        ),
+        (
+            "ContactRepository.get_contact_tombstones",
+            lambda: contacts.get_contact_tombstones(epoch, now, 500, user),
+        ),
+        (
+            "ContactRepository.delete_expired_tombstones",
+            lambda: contacts.delete_expired_tombstones(
+                datetime.timedelta(days=30), 5_000
+            ),
+        ),
+        (
+            "ContactRepository.create_contact",
+            lambda: contacts.create_contact(contact_data, user),
+        ),
+        (
+            "ContactRepository.bulk_upsert_contacts",
+            lambda: contacts.bulk_upsert_contacts(import_rows, user),
+        ),
+        (
+            "ContactRepository.update_contact",
+            lambda: contacts.update_contact(
+                0, ContactUpdate(phone_number="+380000000000"), user
+            ),
+        ),
+        (
+            "ContactRepository.delete_contact",
+            lambda: contacts.delete_contact(0, user),
+        ),
+        (
+            "ContactRepository.batch_mutate_contacts",
+            lambda: contacts.batch_mutate_contacts(batch_updates, [0], user),
+        ),
+        (
+            "UserRepository.create_user",
+            lambda: users.create_user(new_user, "not-a-hash"),
+        ),
+        (
+            "UserRepository.confirm_email",
+            lambda: users.confirm_email(user.email),
+        ),
+        (
+            "UserRepository.update_avatar_url",
+            lambda: users.update_avatar_url(user.email, "https://example.com/a.png"),
+        ),
+    ]
+
+
+async def test_repository_queries_use_indexes(db_connection, db_session):
+    user = await _seed(db_connection)
+    capture = _Capture()
+    event.listen(
+        db_connection.sync_engine,
+        "before_cursor_execute",
+        capture.before_cursor_execute,
+    )
+    queries = _repository_queries(db_session, user)
+    for label, query in queries:
+        capture.label = label
+        await query()
+    capture.label = None
+
+    failures = []
+    for label, statement, parameters in capture.statements:
+        result = await db_connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        for table in _seq_scans(plan[0]["Plan"]):
+            failures.append(f"{label}: sequential scan on {table}")
+
+    assert {label for label, _, _ in capture.statements} == {
+        label for label, _ in queries
+    }
+    assert failures == []
@@ -0,0 +1,71 @@
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.conf.config import settings
+from src.database.db import DatabaseSessionManager
+from src.middleware import ReadYourWritesMiddleware
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, window=5.0)
+
+    @app.get("/state")
+    async def state(request: Request):
+        return {"last_write_at": getattr(request.state, "last_write_at", None)}
+
+    @app.post("/write")
+    async def write():
+        return {}
+
+    @app.post("/fail", status_code=409)
+    async def fail():
+        return {}
+
+    return TestClient(app)
+
+
+def test_successful_write_sets_cookie_read_back_on_next_request():
+    client = _client()
+    assert client.get("/state").json() == {"last_write_at": None}
+
+    before = time.time()
+    response = client.post("/write")
+
+    cookie = response.headers["set-cookie"]
+    assert "Max-Age=5" in cookie and "HttpOnly" in cookie
+    last_write_at = client.get("/state").json()["last_write_at"]
+    assert before - 0.001 <= last_write_at <= time.time()
+
+
+def test_failed_write_and_reads_do_not_set_cookie():
+    client = _client()
+
+    assert "set-cookie" not in client.post("/fail").headers
+    assert "set-cookie" not in client.get("/state").headers
+
+
+def test_invalid_cookie_is_ignored():
+    client = _client()
+    client.cookies.set(ReadYourWritesMiddleware.cookie_name, "soon")
+
+    assert client.get("/state").json() == {"last_write_at": None}
+
+
+def test_reads_follow_client_write_time_across_workers():
+    # A worker that did not take the write has no entry for the user.
+    manager = DatabaseSessionManager()
+    manager._replicas = [object()]
+    window = settings.DB_READ_YOUR_WRITES_SECONDS
+    now = time.time()
+
+    assert not manager._reads_from_primary(1, None)
+    assert manager._reads_from_primary(1, now - window / 2)
+    assert not manager._reads_from_primary(1, now - window - 1)
+    # A write time in the future is not trusted.
+    assert not manager._reads_from_primary(1, now + 60)
+
+    manager.mark_write(1)
+    assert manager._reads_from_primary(1, None)
@@ -0,0 +1,36 @@
+import pytest
+from fastapi import HTTPException
+
+from src.api import util_router
+from src.database.db import DatabaseSessionManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = DatabaseSessionManager()
+    # Nothing listens on port 1, so connecting fails straight away.
+    manager.init("postgresql+asyncpg://postgres@127.0.0.1:1/db")
+    monkeypatch.setattr(util_router, "session_manager", manager)
+    yield manager
+
+
+async def test_failed_warm_up_is_not_ready_and_is_retried(manager):
+    await manager.warm_up(1)
+    assert manager.warm_up_state == "failed"
+
+    with pytest.raises(HTTPException) as error:
+        await util_router.readiness()
+
+    assert error.value.status_code == 503
+    retry = manager._warm_up_retry
+    assert retry is not None
+    await retry
+    assert manager.warm_up_state == "failed"
+    await manager.close()
+
+
+async def test_successful_warm_up_is_ready(manager):
+    manager.warm_up_state = "done"
+
+    assert await util_router.readiness() == {"warm_up": "done"}
+    await manager.close()
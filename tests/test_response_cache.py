@@ -0,0 +1,100 @@
+import asyncio
+import sys
+from pathlib import Path
+
+from starlette.responses import Response
+
+from src.cache import CacheLookup, MemoryCacheBackend, ResponseCache, SocketCacheBackend
+
+
+def _cache(maxsize: int = 100) -> ResponseCache:
+    return ResponseCache(MemoryCacheBackend(maxsize, ttl=60.0), ttl=60.0)
+
+
+async def test_write_invalidates_cached_responses():
+    cache = _cache()
+    lookup = await cache.lookup(1, "/contacts", [("limit", "10")])
+    await cache.store(lookup, Response(b"[]", media_type="application/json"))
+    assert (await cache.lookup(1, "/contacts", [("limit", "10")])).response
+
+    await cache.invalidate_user(1)
+
+    assert (await cache.lookup(1, "/contacts", [("limit", "10")])).response is None
+
+
+async def test_versions_are_bounded_and_eviction_only_causes_misses():
+    backend = MemoryCacheBackend(maxsize=2, ttl=60.0)
+    first = await backend.get_version("version:1")
+    await backend.get_version("version:2")
+    await backend.get_version("version:3")
+
+    assert len(backend._versions) == 2
+    assert await backend.get_version("version:1") > first
+
+
+# Runs in a separate process: takes a write for user 1 on another worker.
+INVALIDATE_IN_OTHER_WORKER = """
+import asyncio, sys
+from src.cache import ResponseCache, SocketCacheBackend
+
+async def main():
+    cache = ResponseCache(SocketCacheBackend(sys.argv[1], 100, ttl=60.0), ttl=60.0)
+    await cache.invalidate_user(1)
+    assert cache.invalidations == 1
+    await cache.close()
+
+asyncio.run(main())
+"""
+
+
+async def test_write_in_another_process_invalidates_shared_cache(tmp_path):
+    path = str(tmp_path / "cache.sock")
+    cache = ResponseCache(SocketCacheBackend(path, 100, ttl=60.0), ttl=60.0)
+    try:
+        lookup = await cache.lookup(1, "/contacts", [("limit", "10")])
+        await cache.store(lookup, Response(b"[]", media_type="application/json"))
+        assert (await cache.lookup(1, "/contacts", [("limit", "10")])).response
+
+        worker = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            INVALIDATE_IN_OTHER_WORKER,
+            path,
+            cwd=Path(__file__).parents[1],
+        )
+        assert await worker.wait() == 0
+
+        assert (await cache.lookup(1, "/contacts", [("limit", "10")])).response is None
+    finally:
+        await cache.close()
+
+
+async def test_workers_share_entries_through_the_socket(tmp_path):
+    path = str(tmp_path / "cache.sock")
+    serving = ResponseCache(SocketCacheBackend(path, 100, ttl=60.0), ttl=60.0)
+    connected = ResponseCache(SocketCacheBackend(path, 100, ttl=60.0), ttl=60.0)
+    try:
+        lookup = await serving.lookup(1, "/contacts", [])
+        await serving.store(lookup, Response(b"[1]", media_type="application/json"))
+
+        cached = await connected.lookup(1, "/contacts", [])
+        assert cached.response is not None and cached.response.body == b"[1]"
+        assert connected.backend._writer is not None
+
+        await connected.invalidate_user(1)
+        assert (await serving.lookup(1, "/contacts", [])).response is None
+    finally:
+        await connected.close()
+        await serving.close()
+
+
+async def test_unreachable_backend_misses_and_stores_nothing(tmp_path):
+    backend = SocketCacheBackend(str(tmp_path / "missing" / "cache.sock"), 100, 60.0)
+    cache = ResponseCache(backend, ttl=60.0)
+
+    lookup = await cache.lookup(1, "/contacts", [])
+    await cache.store(lookup, Response(b"[]", media_type="application/json"))
+    await cache.invalidate_user(1)
+
+    assert lookup == CacheLookup("", None)
+    assert backend._server is None and not backend._local._entries
@@ -0,0 +1,48 @@
+import datetime
+import json
+
+from src.api.responses import CONTACT_FIELDS, ContactListResponse
+from src.schemas import ContactResponse
+
+ROWS = [
+    (
+        1,
+        "Jane",
+        "Doe",
+        "jane@example.com",
+        "+380501234567",
+        datetime.date(1990, 5, 17),
+        datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+        datetime.datetime(2026, 1, 2, 3, 4, 5, 120000, tzinfo=datetime.timezone.utc),
+    ),
+    (
+        2,
+        "Łukasz",
+        "Żak",
+        "lukasz@example.com",
+        None,
+        None,
+        datetime.datetime(
+            2026,
+            1,
+            2,
+            3,
+            4,
+            5,
+            1,
+            tzinfo=datetime.timezone(datetime.timedelta(hours=2)),
+        ),
+        datetime.datetime(2026, 1, 2, 3, 4, 5),
+    ),
+]
+
+
+def test_contact_list_matches_contact_response():
+    body = ContactListResponse(ROWS).body
+
+    expected = [
+        json.loads(ContactResponse(**dict(zip(CONTACT_FIELDS, row))).model_dump_json())
+        for row in ROWS
+    ]
+    assert json.loads(body) == expected
+    assert b'"2026-01-02T03:04:05Z"' in body
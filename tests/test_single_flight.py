@@ -0,0 +1,48 @@
+import asyncio
+
+from src.cache import SingleFlight
+
+
+async def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.do("key", load) for _ in range(3)))
+
+    assert results == [1, 1, 1]
+    assert flight.stats() == {"leaders": 1, "coalesced": 2, "in_flight": 0}
+
+
+async def test_calls_after_invalidate_do_not_join_earlier_flight():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    versions = iter(["before", "after"])
+
+    async def load():
+        version = next(versions)
+        if version == "before":
+            await release.wait()
+        return version
+
+    before = asyncio.create_task(flight.do("key", load, scope=1))
+    await asyncio.sleep(0)
+    flight.invalidate(1)
+    after = await flight.do("key", load, scope=1)
+    release.set()
+
+    assert (await before, after) == ("before", "after")
+    assert not flight._generations and not flight._scope_calls
+
+
+async def test_invalidate_without_flights_keeps_no_state():
+    flight = SingleFlight()
+
+    flight.invalidate(1)
+
+    assert not flight._generations